@@ -0,0 +1,143 @@
+"""
+Admission control in front of OCR.
+
+At most `max_concurrent` OCR slots are held at once; a request that fans out
+into several upstream calls holds one slot per call. Up to `max_queue` more
+requests wait in FIFO order for their slots. Anything beyond that is shed immediately, and
+a waiter that cannot get a slot within the queue timeout (or its request
+deadline, if sooner) is shed too. Failing a few requests fast keeps latency
+bounded for the ones that are admitted, instead of every request timing
+out together under a burst.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Tuple
+
+import deadline
+from timings import LatencyHistogram
+
+class Overloaded(Exception):
+    """A request was shed; status_code is 429 (queue full) or 503 (queue wait expired)"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Concurrency limiter with a bounded wait queue and queue-time deadlines"""
+
+    def __init__(self, max_concurrent: int = 32, max_queue: int = 64, queue_timeout: float = 2.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.running = 0
+        self.waiters: Deque[Tuple[asyncio.Future, int]] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        # Moving average of how long an admitted request holds its slot
+        self.service_s = 1.0
+        self.queue_wait = LatencyHistogram()
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue has likely drained"""
+        return max(1, math.ceil((len(self.waiters) + 1) * self.service_s / self.max_concurrent))
+
+    async def _acquire(self, weight: int) -> None:
+        if self.running + weight <= self.max_concurrent and not self.waiters:
+            self.running += weight
+            return
+        if len(self.waiters) >= self.max_queue:
+            self.shed_queue_full += 1
+            raise Overloaded(429, "Server busy: OCR queue is full", self.retry_after())
+
+        timeout = self.queue_timeout
+        budget = deadline.remaining()
+        if budget is not None:
+            timeout = min(timeout, budget)
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append((waiter, weight))
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            # _wake hands the slots over by resolving the future, with
+            # `running` already counting them
+            await asyncio.wait_for(waiter, max(0.0, timeout))
+        except asyncio.TimeoutError:
+            self._forget(waiter)
+            self.shed_timeout += 1
+            raise Overloaded(503, "Server busy: timed out waiting for an OCR slot", self.retry_after()) from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Cancelled right after being handed its slots: pass them on
+                self._release(weight)
+            else:
+                self._forget(waiter)
+            raise
+        finally:
+            self.queue_wait.observe((time.perf_counter() - start) * 1000)
+
+    def _forget(self, waiter: asyncio.Future) -> None:
+        for entry in self.waiters:
+            if entry[0] is waiter:
+                self.waiters.remove(entry)
+                break
+        # A heavy waiter leaving the head may let lighter ones behind it in
+        self._wake()
+
+    def _release(self, weight: int) -> None:
+        self.running -= weight
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand free slots to waiters at the head of the queue while they fit"""
+        while self.waiters:
+            waiter, weight = self.waiters[0]
+            if waiter.done():
+                self.waiters.popleft()
+                continue
+            if self.running + weight > self.max_concurrent:
+                return
+            self.waiters.popleft()
+            self.running += weight
+            waiter.set_result(None)
+
+    @asynccontextmanager
+    async def admit(self, weight: int = 1):
+        """
+        Hold `weight` OCR slots (one per upstream call the request makes) for
+        the block; raises Overloaded when shed
+        """
+        if self.max_concurrent <= 0:
+            yield
+            return
+        # Never ask for more than there is, or the request could not run at all
+        weight = max(1, min(weight, self.max_concurrent))
+        await self._acquire(weight)
+        self.admitted += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.service_s = 0.9 * self.service_s + 0.1 * (time.perf_counter() - start)
+            self._release(weight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queue_depth": len(self.waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_timeout": self.shed_timeout,
+            "queue_wait": self.queue_wait.stats(),
+        }
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Concurrent throughput benchmark for the OCR endpoints against a local mock upstream.
+
+Starts mock_openai on a local port, points the backend at it and fires
+CONCURRENCY simultaneous /extract-base64 requests, while probing /plates
+to show that lookups are not stuck behind in-flight OCR calls.
+
+    python bench_concurrency.py [concurrency] [mock_latency_ms]
+"""
+
+import asyncio
+import base64
+import os
+import socket
+import sys
+import threading
+import time
+
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+MOCK_LATENCY_MS = sys.argv[2] if len(sys.argv) > 2 else "1000"
+IMAGE_PATH = "images/plate2.jpg"
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_mock_upstream() -> str:
+    """Run the mock Responses API in a background thread and return its base URL"""
+    import uvicorn
+
+    os.environ["MOCK_LATENCY_MS"] = MOCK_LATENCY_MS
+    import mock_openai
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(mock_openai.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/v1"
+
+async def run_benchmark():
+    import httpx
+
+    os.environ["OPENAI_BASE_URL"] = start_mock_upstream()
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    import main
+
+    with open(IMAGE_PATH, "rb") as f:
+        payload = {"base64_image": base64.b64encode(f.read()).decode("ascii")}
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as http:
+        # Warm up the upstream connection pool
+        await http.post("/extract-base64", json=payload)
+
+        async def probe_plates():
+            await asyncio.sleep(0.1)
+            start = time.perf_counter()
+            await http.get("/plates")
+            return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(http.post("/extract-base64", json=payload) for _ in range(CONCURRENCY)),
+            probe_plates(),
+        )
+        elapsed = time.perf_counter() - start
+
+    responses, probe_ms = results[:-1], results[-1]
+    ok = sum(1 for r in responses if r.status_code in (200, 203))
+    print(f"📊 Concurrency: {CONCURRENCY}, mock upstream latency: {MOCK_LATENCY_MS} ms")
+    print(f"✅ Successful: {ok}/{CONCURRENCY}")
+    print(f"⏱️  Wall time: {elapsed:.2f} s")
+    print(f"🚀 Throughput: {CONCURRENCY / elapsed:.1f} req/s")
+    print(f"🔎 /plates latency during load: {probe_ms:.1f} ms")
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Build time, memory and query latency of the fuzzy plate index.
+
+Indexes PLATES synthetic plate numbers, then queries with OCR-style
+corruptions (confusable swaps, substitutions, dropped and extra characters)
+and checks the original plate is among the candidates.
+
+    python bench_fuzzy_index.py [plates] [queries] [max_distance]
+"""
+
+import random
+import string
+import sys
+import time
+import tracemalloc
+
+from fuzzy_index import FuzzyPlateIndex
+
+PLATES = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+QUERIES = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+MAX_DISTANCE = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+CONFUSIONS = {"O": "0", "0": "O", "I": "1", "1": "I", "B": "8", "8": "B", "S": "5", "5": "S", "Z": "2", "G": "6"}
+CHARS = string.ascii_uppercase + string.digits
+
+def synthetic_plate(i: int) -> str:
+    """Deterministic, unique 7-character plate for row i"""
+    out = []
+    for _ in range(7):
+        i, r = divmod(i, len(CHARS))
+        out.append(CHARS[r])
+    return "".join(out)
+
+class PlateNumber:
+    """Stand-in for LicensePlate: the index only reads plate_number"""
+    __slots__ = ("plate_number",)
+
+    def __init__(self, plate_number: str):
+        self.plate_number = plate_number
+
+def corrupt(plate: str, rng: random.Random) -> str:
+    """Apply one OCR-style error"""
+    i = rng.randrange(len(plate))
+    kind = rng.choice(("confuse", "substitute", "drop", "insert"))
+    if kind == "confuse":
+        swappable = [j for j, c in enumerate(plate) if c in CONFUSIONS]
+        if swappable:
+            j = rng.choice(swappable)
+            return plate[:j] + CONFUSIONS[plate[j]] + plate[j + 1:]
+        kind = "substitute"
+    if kind == "substitute":
+        return plate[:i] + rng.choice(CHARS) + plate[i + 1:]
+    if kind == "drop":
+        return plate[:i] + plate[i + 1:]
+    return plate[:i] + rng.choice(CHARS) + plate[i:]
+
+def percentile(samples, pct):
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+def main():
+    rng = random.Random(42)
+    numbers = [synthetic_plate(i * 7919) for i in range(PLATES)]
+    index = FuzzyPlateIndex(MAX_DISTANCE)
+
+    print(f"🔄 Indexing {PLATES:,} plates (max distance {MAX_DISTANCE})...")
+    tracemalloc.start()
+    start = time.perf_counter()
+    index.plates_added(PlateNumber(number) for number in numbers)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"📊 Build time: {elapsed:.1f} s, index memory {current / 2**20:.0f} MiB (peak {peak / 2**20:.0f} MiB)")
+
+    originals = [rng.choice(numbers) for _ in range(QUERIES)]
+    queries = [corrupt(plate, rng) for plate in originals]
+    samples = []
+    found = 0
+    for original, query in zip(originals, queries):
+        t0 = time.perf_counter()
+        candidates = index.candidates(query)
+        samples.append((time.perf_counter() - t0) * 1e6)
+        found += any(number == original for number, _ in candidates)
+    samples.sort()
+    print(f"🔎 Query: p50 {percentile(samples, 50):.1f} µs, "
+          f"p99 {percentile(samples, 99):.1f} µs, max {samples[-1]:.1f} µs")
+    print(f"✅ Original plate among candidates: {found / QUERIES:.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tail latency of the vision client with and without hedged requests.
+
+Starts mock_openai with a slow tail (MOCK_SLOW_RATE of calls take
+MOCK_SLOW_MS) and reads CALLS crop images through OpenAIBackend, first
+plain, then with hedging enabled. A hedged call fires a duplicate once it
+outlives the recent p95 and takes whichever answer arrives first.
+
+    python bench_hedging.py [calls] [concurrency] [slow_rate]
+"""
+
+import asyncio
+import base64
+import os
+import socket
+import sys
+import threading
+import time
+
+CALLS = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+SLOW_RATE = sys.argv[3] if len(sys.argv) > 3 else "0.05"
+IMAGE_PATH = "images/plate2.jpg"
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def percentile(samples, pct):
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+def start_mock_upstream() -> str:
+    """Run the mock Responses API with an injected slow tail and return its base URL"""
+    import uvicorn
+
+    os.environ.setdefault("MOCK_LATENCY_MS", "100")
+    os.environ.setdefault("MOCK_SLOW_MS", "2000")
+    os.environ["MOCK_SLOW_RATE"] = SLOW_RATE
+    import mock_openai
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(mock_openai.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/v1"
+
+async def run(hedge: bool, image_ref: str):
+    from ocr_backends import OpenAIBackend
+
+    backend = OpenAIBackend("mock", hedge=hedge)
+    samples = []
+    queue = asyncio.Queue()
+    for _ in range(CALLS):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            t0 = time.perf_counter()
+            await backend.read_plate(image_ref)
+            samples.append((time.perf_counter() - t0) * 1000)
+
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    samples.sort()
+    stats = backend.stats()
+    label = "hedged" if hedge else "plain "
+    print(f"📊 {label}: p50 {percentile(samples, 50):.0f} ms, p95 {percentile(samples, 95):.0f} ms, "
+          f"p99 {percentile(samples, 99):.0f} ms, max {samples[-1]:.0f} ms "
+          f"(hedges {stats['hedges']}, won {stats['hedge_wins']})")
+
+async def main():
+    os.environ["OPENAI_BASE_URL"] = start_mock_upstream()
+    with open(IMAGE_PATH, "rb") as f:
+        image_ref = "data:image/jpeg;base64," + base64.b64encode(f.read()).decode("ascii")
+
+    print(f"🔄 {CALLS} calls at concurrency {CONCURRENCY}, {float(SLOW_RATE):.0%} of upstream calls slow...")
+    await run(False, image_ref)
+    await run(True, image_ref)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Reproducible load test of the HTTP API against the local mock vision server.
+
+Starts mock_openai with the configured latency and error distribution, runs
+the app in-process (or targets --url) and drives each scenario with
+--requests calls at --concurrency:
+
+    extract                    /extract with a multipart file upload
+    extract-base64             /extract-base64
+    extract-all-plates-base64  /extract-all-plates-base64
+    plate-create               POST /plate
+    plate-read                 GET /plate/{plate_number}
+    plate-list                 GET /plates
+    plate-delete               DELETE /plate/{plate_number}
+
+Image requests cycle through the fixtures in images/. Each request's image
+has its index drawn into the pixels, so in-flight dedupe (keyed on the
+normalized image) never folds concurrent requests into one. The in-process
+app also runs with OCR_CACHE_SIZE=0, so no request is answered
+from the result cache; against --url, turn that cache off on the server. Throughput and p50/p95/p99 per scenario are
+printed and written as JSON to --output. Pass --compare with an earlier
+results file to see the change.
+
+    python bench_load.py --concurrency 16 --requests 200 --latency-ms 300 --jitter-ms 100 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import platform
+import socket
+import subprocess
+import tempfile
+import threading
+import io
+import time
+from datetime import datetime, timezone
+
+IMAGES = [("plate2.jpg", "image/jpeg"), ("plate1.webp", "image/webp"), ("image.png", "image/png")]
+SCENARIOS = [
+    "extract",
+    "extract-base64",
+    "extract-all-plates-base64",
+    "plate-create",
+    "plate-read",
+    "plate-list",
+    "plate-delete",
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of scenarios")
+    parser.add_argument("--latency-ms", type=float, default=300, help="mock upstream base latency")
+    parser.add_argument("--jitter-ms", type=float, default=100, help="mean of the exponential latency jitter")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of upstream calls that take --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=3000)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of upstream calls that fail with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of upstream calls that fail with 429")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app (no mock is started)")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    return parser.parse_args()
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def percentile(samples, pct):
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+def start_mock_upstream(args) -> str:
+    """Run the mock Responses API in a background thread and return its base URL"""
+    import uvicorn
+
+    os.environ.update({
+        "MOCK_LATENCY_MS": str(args.latency_ms),
+        "MOCK_JITTER_MS": str(args.jitter_ms),
+        "MOCK_SLOW_RATE": str(args.slow_rate),
+        "MOCK_SLOW_MS": str(args.slow_ms),
+        "MOCK_ERROR_RATE": str(args.error_rate),
+        "MOCK_RATE_LIMIT_RATE": str(args.rate_limit_rate),
+        "MOCK_SEED": str(args.seed),
+    })
+    import mock_openai
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(mock_openai.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/v1"
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def load_images():
+    images = []
+    for name, content_type in IMAGES:
+        with open(os.path.join("images", name), "rb") as f:
+            images.append((name, content_type, f.read()))
+    return images
+
+def unique_image(images, i: int):
+    """Fixture image with i drawn into its top-left corner as a row of black/white cells"""
+    from PIL import Image, ImageDraw
+
+    name, content_type, data = images[i % len(images)]
+    img = Image.open(io.BytesIO(data))
+    fmt = img.format
+    img = img.convert("RGB")
+    cell = max(4, img.width // 64)
+    draw = ImageDraw.Draw(img)
+    for bit in range(32):
+        fill = (255, 255, 255) if i >> bit & 1 else (0, 0, 0)
+        draw.rectangle([bit * cell, 0, bit * cell + cell - 1, cell - 1], fill=fill)
+    out = io.BytesIO()
+    img.save(out, fmt)
+    return name, content_type, out.getvalue()
+
+def bench_plate(i: int) -> dict:
+    return {
+        "plate_number": f"LOAD{i:05d}",
+        "owner_name": f"Load Test {i}",
+        "dob": "1990-01-01",
+        "has_warrant": i % 10 == 0,
+        "warrant_reason": "Load test" if i % 10 == 0 else None,
+        "registration_date": "2024-01-01",
+        "is_stolen": i % 25 == 0,
+    }
+
+def build_request(scenario: str, i: int, images):
+    """(method, path, httpx keyword arguments) for request i of a scenario"""
+    if scenario == "extract":
+        name, content_type, data = unique_image(images, i)
+        return "POST", "/extract", {"files": {"file": (name, data, content_type)}}
+    if scenario in ("extract-base64", "extract-all-plates-base64"):
+        _, _, data = unique_image(images, i)
+        return "POST", f"/{scenario}", {"json": {"base64_image": base64.b64encode(data).decode("ascii")}}
+    if scenario == "plate-create":
+        return "POST", "/plate", {"json": bench_plate(i)}
+    if scenario == "plate-read":
+        return "GET", f"/plate/LOAD{i:05d}", {}
+    if scenario == "plate-list":
+        return "GET", "/plates", {"params": {"limit": 100}}
+    if scenario == "plate-delete":
+        return "DELETE", f"/plate/LOAD{i:05d}", {}
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+async def run_scenario(http, scenario: str, args, images) -> dict:
+    """Fire args.requests requests of one scenario from args.concurrency workers"""
+    samples = []
+    statuses = {}
+    # Built up front so image encoding is not part of the measurement
+    pending = iter([build_request(scenario, i, images) for i in range(args.requests)])
+
+    async def worker():
+        for method, path, kwargs in pending:
+            t0 = time.perf_counter()
+            try:
+                response = await http.request(method, path, **kwargs)
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            samples.append((time.perf_counter() - t0) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    samples.sort()
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    return {
+        "requests": len(samples),
+        "ok": ok,
+        "errors": len(samples) - ok,
+        "status": statuses,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 2),
+        "mean_ms": round(sum(samples) / len(samples), 2),
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "max_ms": round(samples[-1], 2),
+    }
+
+def compare(results: dict, path: str) -> None:
+    with open(path) as f:
+        baseline = json.load(f)
+    print(f"\n📈 Compared with {path} ({baseline.get('commit', 'unknown')}):")
+    for scenario, now in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(scenario)
+        if not before:
+            continue
+        deltas = []
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            if before[key]:
+                deltas.append(f"{key} {(now[key] - before[key]) / before[key]:+.1%}")
+        print(f"   {scenario}: " + ", ".join(deltas))
+
+async def main():
+    import httpx
+
+    args = parse_args()
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario: {name} (choose from {', '.join(SCENARIOS)})")
+    images = load_images()
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=120)
+    else:
+        os.environ["OPENAI_BASE_URL"] = start_mock_upstream(args)
+        os.environ.setdefault("OPENAI_API_KEY", "mock")
+        # Every request should reach the mock upstream rather than the OCR cache
+        os.environ.setdefault("OCR_CACHE_SIZE", "0")
+        # A throwaway database so repeated runs start from the same state
+        os.environ.setdefault("PLATE_DB_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+        import main as app_main
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app_main.app), base_url="http://bench", timeout=120)
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "scenarios": {},
+    }
+    print(f"🔄 {args.requests} requests per scenario at concurrency {args.concurrency}"
+          + (f" against {args.url}" if args.url else f", mock upstream {args.latency_ms:g} ms + {args.jitter_ms:g} ms jitter"))
+    async with client as http:
+        # Warm up connection pools and lazy imports outside the measurements
+        if not args.url or "extract-base64" in scenarios:
+            await http.post("/extract-base64", json={"base64_image": base64.b64encode(images[0][2]).decode("ascii")})
+        for scenario in scenarios:
+            stats = await run_scenario(http, scenario, args, images)
+            results["scenarios"][scenario] = stats
+            print(f"📊 {scenario}: {stats['throughput_rps']:.1f} req/s, p50 {stats['p50_ms']:.0f} ms, "
+                  f"p95 {stats['p95_ms']:.0f} ms, p99 {stats['p99_ms']:.0f} ms, "
+                  f"{stats['ok']}/{stats['requests']} ok {stats['status']}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency of the local Tesseract OCR path.
+
+Each fixture in images/ is read as a full frame, and every plate crop the
+detector finds in it is read as a crop scan, through
+TesseractBackend.read_plate_scored exactly as the API calls it (data URL
+in, decode, region detection when needed, Tesseract). Prints p50/p95 per
+input kind, the detector's share of the frame path and whether the crop
+path meets the 100 ms target. Needs the tesseract binary and pytesseract.
+
+    python bench_ocr_local.py [rounds] [max_regions]
+"""
+
+import asyncio
+import base64
+import glob
+import shutil
+import sys
+import time
+
+from image_pipeline import DETECT_DECODE_DIM, crop_plate_regions, decode_image
+from ocr_backends import TesseractBackend
+from plate_detector import find_plate_regions
+
+ROUNDS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+MAX_REGIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+CROP_TARGET_MS = 100
+IMAGE_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp"}
+
+def data_url(data: bytes, media_type: str) -> str:
+    return f"data:{media_type};base64,{base64.b64encode(data).decode()}"
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+async def time_reads(backend: TesseractBackend, refs):
+    """Milliseconds of every read, and the last answer per ref"""
+    samples, answers = [], {}
+    for _ in range(ROUNDS):
+        for ref in refs:
+            t0 = time.perf_counter()
+            answers[ref] = await backend.read_plate_scored(ref)
+            samples.append((time.perf_counter() - t0) * 1000)
+    return samples, answers
+
+def main():
+    if shutil.which("tesseract") is None:
+        sys.exit("❌ tesseract binary not found on PATH")
+    backend = TesseractBackend(max_regions=MAX_REGIONS)
+
+    frames, crops, detect_ms = [], [], []
+    for path in sorted(glob.glob("images/*")):
+        media_type = IMAGE_TYPES.get(path[path.rfind("."):].lower())
+        if media_type is None:
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        frames.append(data_url(data, media_type))
+        crops += [data_url(crop.data, "image/jpeg") for crop in crop_plate_regions(data, max_regions=MAX_REGIONS)]
+        img = decode_image(data, DETECT_DECODE_DIM)
+        for _ in range(ROUNDS):
+            t0 = time.perf_counter()
+            find_plate_regions(img, MAX_REGIONS)
+            detect_ms.append((time.perf_counter() - t0) * 1000)
+
+    print(f"🔄 {len(frames)} frames, {len(crops)} crops, {ROUNDS} rounds each")
+    results = {}
+    for kind, refs in (("frame", frames), ("crop", crops)):
+        samples, answers = asyncio.run(time_reads(backend, refs))
+        results[kind] = samples
+        print(f"📊 {kind:5s}: p50 {percentile(samples, 50):6.1f} ms, p95 {percentile(samples, 95):6.1f} ms "
+              f"({', '.join(text for text, _ in answers.values())})")
+    print(f"🔎 detector alone: p50 {percentile(detect_ms, 50):.1f} ms, p95 {percentile(detect_ms, 95):.1f} ms per frame")
+
+    crop_p95 = percentile(results["crop"], 95)
+    mark = "✅" if crop_p95 < CROP_TARGET_MS else "❌"
+    print(f"{mark} crop scan p95 {crop_p95:.1f} ms (target {CROP_TARGET_MS} ms)")
+
+if __name__ == "__main__":
+    main()
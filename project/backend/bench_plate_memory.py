@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Memory footprint of the in-process plate stores.
+
+Loads ROWS synthetic plates into the dict-of-models store and the columnar
+compact store, reports bytes per plate and the projected size of a
+10M-plate hotlist, then times lookups from the compact store.
+
+    python bench_plate_memory.py [rows]
+"""
+
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+from models import LicensePlate
+from plate_store import CompactPlateStore, MemoryPlateStore
+from bench_plate_store import percentile, synthetic_plate
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+BATCH = 50_000
+HOTLIST = 10_000_000
+REASONS = ["Unpaid parking tickets", "Speeding violations", "Failure to appear", "Expired registration"]
+
+def synthetic_plates(start: int, stop: int):
+    for i in range(start, stop):
+        warrant = i % 97 == 0
+        yield LicensePlate.model_construct(
+            plate_number=synthetic_plate(i * 7919),
+            owner_name=f"Owner {i}",
+            dob=date(1950 + i % 50, 1 + i % 12, 1 + i % 28),
+            has_warrant=warrant,
+            warrant_reason=REASONS[i % len(REASONS)] if warrant else None,
+            registration_date=date(2000 + i % 25, 1 + i % 12, 1 + i % 28),
+            is_stolen=i % 211 == 0,
+        )
+
+def measure(store_class):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = store_class()
+    for offset in range(0, ROWS, BATCH):
+        store.add_many(synthetic_plates(offset, min(ROWS, offset + BATCH)))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    per_plate = size / ROWS
+    print(f"📊 {store_class.__name__}: {size / 2**20:.0f} MiB for {ROWS:,} plates, {per_plate:.0f} B/plate, "
+          f"~{per_plate * HOTLIST / 2**30:.1f} GiB projected for {HOTLIST:,} (load {elapsed:.1f} s)")
+    return store
+
+def main():
+    print(f"🔄 Loading {ROWS:,} synthetic plates into each store...")
+    # Drop the dict store before measuring the next one
+    measure(MemoryPlateStore)
+    store = measure(CompactPlateStore)
+
+    keys = [synthetic_plate(random.randrange(ROWS) * 7919) for _ in range(20_000)]
+    samples = []
+    for key in keys:
+        t0 = time.perf_counter()
+        store.lookup(key)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    print(f"🔎 Compact lookup (builds the model): p50 {percentile(samples, 50):.1f} µs, "
+          f"p99 {percentile(samples, 99):.1f} µs")
+
+if __name__ == "__main__":
+    main()
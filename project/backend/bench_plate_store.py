@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Point-lookup latency benchmark for the SQLite plate store.
+
+Fills a temporary database with ROWS synthetic plates, then times random
+lookups of present and absent plates, straight from the store and behind
+the hotlist index (Bloom filter fast-negative and alert flags).
+
+    python bench_plate_store.py [rows] [lookups]
+"""
+
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from datetime import date
+
+from hotlist_index import HotlistIndex
+from plate_store import SQLitePlateStore
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+LOOKUPS = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+BATCH = 50_000
+
+def synthetic_plate(i: int) -> str:
+    """Deterministic, unique 7-character plate for row i"""
+    chars = string.ascii_uppercase + string.digits
+    out = []
+    for _ in range(7):
+        i, r = divmod(i, len(chars))
+        out.append(chars[r])
+    return "".join(out)
+
+def synthetic_rows(start: int, stop: int):
+    for i in range(start, stop):
+        yield (
+            synthetic_plate(i * 7919),
+            f"Owner {i}",
+            date(1950 + i % 50, 1 + i % 12, 1 + i % 28).isoformat(),
+            int(i % 97 == 0),
+            "Unpaid parking tickets" if i % 97 == 0 else None,
+            date(2000 + i % 25, 1 + i % 12, 1 + i % 28).isoformat(),
+            int(i % 211 == 0),
+        )
+
+def percentile(samples, pct):
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "bench_plates.db")
+    store = SQLitePlateStore(path)
+
+    print(f"🔄 Loading {ROWS:,} plates into {path}...")
+    start = time.perf_counter()
+    for offset in range(0, ROWS, BATCH):
+        with store.lock:
+            store.conn.execute("BEGIN")
+            store.conn.executemany(store.UPSERT_SQL, synthetic_rows(offset, min(ROWS, offset + BATCH)))
+            store.conn.execute("COMMIT")
+    print(f"📊 Load time: {time.perf_counter() - start:.1f} s")
+
+    present = [synthetic_plate(random.randrange(ROWS) * 7919) for _ in range(LOOKUPS)]
+    absent = ["ZZ" + synthetic_plate(i)[:5] + "!" for i in range(LOOKUPS)]
+    for label, keys in (("hit", present), ("miss", absent)):
+        report(f"Lookup {label}", store.lookup, keys)
+
+    print("🔄 Building hotlist index...")
+    start = time.perf_counter()
+    index = HotlistIndex(max(1_000_000, 2 * ROWS))
+    index.plates_added(store.iter_plates(10000))
+    index.mark_ready()
+    stats = index.stats()
+    print(f"📊 Build time: {time.perf_counter() - start:.1f} s, Bloom filter {stats['bloom_bytes'] / 2**20:.1f} MiB, "
+          f"{stats['flagged_plates']:,} flagged plates")
+
+    def gated_lookup(key):
+        return store.lookup(key) if index.might_contain(key) else None
+
+    report("Indexed lookup miss", gated_lookup, absent)
+    report("Indexed lookup hit", gated_lookup, present)
+    flagged = [key for key in present if key in index.flags] or present
+    report("Alert flags (flagged plate)", index.alerts, flagged)
+    false_positives = sum(index.might_contain(key) for key in absent)
+    print(f"📈 Bloom false positives: {false_positives / len(absent):.2%}")
+
+def report(label, fn, keys):
+    samples = []
+    for key in keys:
+        t0 = time.perf_counter()
+        fn(key)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    print(f"🔎 {label}: p50 {percentile(samples, 50):.1f} µs, "
+          f"p99 {percentile(samples, 99):.1f} µs, max {samples[-1]:.1f} µs")
+
+if __name__ == "__main__":
+    main()
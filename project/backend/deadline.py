@@ -0,0 +1,65 @@
+"""
+Per-request time budgets for upstream calls.
+
+A request's deadline is set once at the edge (from the client's budget
+header, capped by the server default) and read by the OCR backends, so an
+upstream call never outlives the client that is waiting on it. The deadline
+lives in a context variable: tasks spawned while handling the request, such
+as batcher flushes and single-flight calls, inherit it.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+current_deadline: ContextVar[Optional[float]] = ContextVar("current_deadline", default=None)
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out before the upstream answered"""
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request's budget, or None when unbounded"""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+@contextmanager
+def budget(seconds: Optional[float]):
+    """Run the block under a deadline `seconds` from now (None: unbounded)"""
+    token = current_deadline.set(None if seconds is None else time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        current_deadline.reset(token)
+
+def parse_budget_ms(value: Optional[str], default_ms: float) -> float:
+    """Client budget header in milliseconds, capped at the server default"""
+    try:
+        requested = float(value) if value else default_ms
+    except ValueError:
+        requested = default_ms
+    return max(0.0, min(requested, default_ms))
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware that starts every HTTP request's deadline from the
+    client's budget header (milliseconds), e.g. `X-Deadline-Ms: 2000`.
+    """
+
+    def __init__(self, app, header: str = "x-deadline-ms", default_ms: float = 15000):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+        self.default_ms = default_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        value = None
+        for name, raw in scope.get("headers") or []:
+            if name == self.header:
+                value = raw.decode("latin-1")
+                break
+        with budget(parse_budget_ms(value, self.default_ms) / 1000):
+            await self.app(scope, receive, send)
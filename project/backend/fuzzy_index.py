@@ -0,0 +1,124 @@
+"""
+Near-match index for OCR output that tolerates common character confusions.
+
+Every plate is stored under a canonical key in which visually confusable
+characters (O/0/Q/D, I/1/L, B/8, S/5, Z/2, G/6) collapse to one symbol, so an
+O<->0 slip is an exact canonical hit. Remaining OCR errors are found by
+generating the canonical edit-distance neighbourhood of the query and
+intersecting it with the key dict, which keeps memory at one entry per plate
+and a k=1 query at a few hundred hash probes.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+CONFUSION_GROUPS = ("O0QD", "I1L", "B8", "S5", "Z2", "G6")
+# Each group collapses onto its digit
+CANONICAL = {char: next(c for c in group if c.isdigit()) for group in CONFUSION_GROUPS for char in group}
+ALPHABET = sorted({CANONICAL.get(c, c) for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"})
+
+def canonicalize(plate: str) -> str:
+    return "".join(CANONICAL.get(c, c) for c in plate.upper())
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance for short strings"""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def edits(word: str) -> Set[str]:
+    """Canonical strings one deletion, substitution or insertion away from word"""
+    variants = set()
+    for i in range(len(word) + 1):
+        head, tail = word[:i], word[i:]
+        if tail:
+            rest = tail[1:]
+            variants.add(head + rest)
+            variants.update([head + c + rest for c in ALPHABET])
+        variants.update([head + c + tail for c in ALPHABET])
+    return variants
+
+def neighbourhood(key: str, distance: int) -> List[Set[str]]:
+    """Canonical strings grouped by their exact edit distance (0..distance) from key"""
+    rings = [{key}]
+    seen = {key}
+    for _ in range(distance):
+        ring = set()
+        for word in rings[-1]:
+            ring.update(edits(word))
+        ring -= seen
+        seen |= ring
+        rings.append(ring)
+    return rings
+
+class FuzzyPlateIndex:
+    """Canonical-key index over plate numbers with ranked near-match queries"""
+
+    def __init__(self, max_distance: int = 1):
+        self.max_distance = max_distance
+        # canonical key -> plate number, or a tuple of them when keys collide
+        self.keys: Dict[str, Union[str, Tuple[str, ...]]] = {}
+        self.lock = threading.Lock()
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def plates_added(self, plates: Iterable) -> None:
+        with self.lock:
+            for plate in plates:
+                number = plate.plate_number.upper()
+                key = canonicalize(number)
+                if key == number:
+                    # Share the string object when the plate has no confusable characters
+                    number = key
+                existing = self.keys.get(key)
+                if existing is None or existing == number:
+                    self.keys[key] = number
+                elif isinstance(existing, tuple):
+                    if number not in existing:
+                        self.keys[key] = existing + (number,)
+                else:
+                    self.keys[key] = (existing, number)
+
+    def plates_removed(self, plate_numbers: Iterable[str]) -> None:
+        with self.lock:
+            for number in plate_numbers:
+                number = number.upper()
+                key = canonicalize(number)
+                existing = self.keys.get(key)
+                if existing == number:
+                    del self.keys[key]
+                elif isinstance(existing, tuple) and number in existing:
+                    rest = tuple(p for p in existing if p != number)
+                    self.keys[key] = rest[0] if len(rest) == 1 else rest
+
+    def mark_ready(self) -> None:
+        self.ready = True
+
+    def reset(self) -> None:
+        with self.lock:
+            self.ready = False
+            self.keys = {}
+
+    def candidates(self, plate: str, max_results: int = 5) -> List[Tuple[str, int]]:
+        """
+        Ranked (plate_number, distance) near matches for an OCR reading.
+        distance is the canonical edit distance (0 = differs only by confusable
+        characters); ties are broken by the raw edit distance.
+        """
+        query = plate.upper()
+        matches = []
+        for distance, ring in enumerate(neighbourhood(canonicalize(query), self.max_distance)):
+            # Set intersection against the key view probes in C rather than per variant
+            for key in ring & self.keys.keys():
+                hit = self.keys.get(key)
+                for number in (hit if isinstance(hit, tuple) else (hit,)):
+                    if number is not None:
+                        matches.append((distance, edit_distance(query, number), number))
+        matches.sort()
+        return [(number, distance) for distance, _, number in matches[:max_results]]
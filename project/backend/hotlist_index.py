@@ -0,0 +1,141 @@
+"""
+In-memory hotlist index kept in front of the plate store.
+
+Most scanned plates are on no list at all. A Bloom filter over every stored
+plate number answers that case without touching the store, and a small flags
+table holds the alert bits (warrant / stolen) of the plates that have any,
+so alert checks never load or rebuild a full record.
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Optional
+
+ALERT_WARRANT = 1
+ALERT_STOLEN = 2
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one 64-bit hash)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _start(self, key: str):
+        # str hashes are cached on the object and the filter never leaves the
+        # process, so the salted builtin hash is fine here
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        return (h & 0xFFFFFFFF) % self.size, ((h >> 32) | 1) % self.size
+
+    def add(self, key: str) -> None:
+        position, step = self._start(key)
+        for _ in range(self.hashes):
+            self.bits[position >> 3] |= 1 << (position & 7)
+            position = (position + step) % self.size
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        position, step = self._start(key)
+        bits, size = self.bits, self.size
+        for _ in range(self.hashes):
+            # Most absent keys stop at the first or second clear bit
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            position = (position + step) % size
+        return True
+
+class HotlistIndex:
+    """
+    Plate-store listener with a scalable Bloom filter of plate numbers and
+    alert flags for flagged plates. Bloom filters cannot forget, so removed
+    plates stay "maybe present" and fall through to the store.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.negatives = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every plate; answers fall through to the store until marked ready again"""
+        with self.lock:
+            self.ready = False
+            # When a filter fills up a twice-as-large one is chained after it
+            self.filters = [BloomFilter(self.capacity, self.error_rate)]
+            self.flags: Dict[str, int] = {}
+            self.warrant_reasons: Dict[str, Optional[str]] = {}
+            # One shared string object per distinct warrant reason
+            self.reasons: Dict[str, str] = {}
+
+    def plates_added(self, plates: Iterable) -> None:
+        with self.lock:
+            for plate in plates:
+                number = plate.plate_number.upper()
+                bloom = self.filters[-1]
+                if bloom.count >= bloom.capacity:
+                    bloom = BloomFilter(bloom.capacity * 2, self.error_rate)
+                    self.filters.append(bloom)
+                bloom.add(number)
+
+                flags = (ALERT_WARRANT if plate.has_warrant else 0) | (ALERT_STOLEN if plate.is_stolen else 0)
+                if flags:
+                    self.flags[number] = flags
+                else:
+                    self.flags.pop(number, None)
+                if plate.has_warrant:
+                    reason = plate.warrant_reason
+                    if reason is not None:
+                        reason = self.reasons.setdefault(reason, reason)
+                    self.warrant_reasons[number] = reason
+                else:
+                    self.warrant_reasons.pop(number, None)
+
+    def plates_removed(self, plate_numbers: Iterable[str]) -> None:
+        with self.lock:
+            for number in plate_numbers:
+                number = number.upper()
+                self.flags.pop(number, None)
+                self.warrant_reasons.pop(number, None)
+
+    def mark_ready(self) -> None:
+        self.ready = True
+
+    def might_contain(self, plate_number: str) -> bool:
+        """False only when the plate is certainly not in the store"""
+        if not self.ready:
+            return True
+        number = plate_number.upper()
+        if any(number in bloom for bloom in self.filters):
+            return True
+        self.negatives += 1
+        return False
+
+    def alerts(self, plate_number: str) -> Optional[List[str]]:
+        """Alert strings for a flagged plate; None when the plate has no alert flags (or may have)"""
+        if not self.ready:
+            return None
+        number = plate_number.upper()
+        flags = self.flags.get(number)
+        if flags is None:
+            return None
+        alerts = []
+        if flags & ALERT_WARRANT:
+            alerts.append(f"WARRANT: {self.warrant_reasons.get(number)}")
+        if flags & ALERT_STOLEN:
+            alerts.append("STOLEN VEHICLE")
+        return alerts
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "ready": self.ready,
+            "bloom_filters": len(self.filters),
+            "bloom_bytes": sum(len(bloom.bits) for bloom in self.filters),
+            "plates_indexed": sum(bloom.count for bloom in self.filters),
+            "flagged_plates": len(self.flags),
+            "fast_negatives": self.negatives,
+        }
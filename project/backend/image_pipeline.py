@@ -0,0 +1,132 @@
+"""
+Server-side image normalization before frames are sent to the vision API.
+
+The vision call uses "detail": "low", so anything above a few hundred pixels
+is wasted upload. Frames are decoded once, downscaled, stripped of metadata
+and re-encoded as a compact JPEG.
+"""
+
+import base64
+import io
+import math
+from typing import List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from ocr_cache import image_key
+from plate_detector import find_plate_regions
+
+# Detection wants more pixels than the upload does; JPEG can still skip to this
+DETECT_DECODE_DIM = 1280
+
+class NormalizedImage:
+    """JPEG bytes ready for upstream plus their cache key"""
+
+    __slots__ = ("data", "width", "height", "image_hash")
+
+    def __init__(self, data: bytes, width: int, height: int, image_hash: bytes):
+        self.data = data
+        self.width = width
+        self.height = height
+        self.image_hash = image_hash
+
+def image_bytes_from_ref(image_ref: str) -> Optional[bytes]:
+    """Decode a data: URL into raw image bytes (None for http(s) URLs)"""
+    if not image_ref.startswith("data:"):
+        return None
+    _, _, payload = image_ref.partition(",")
+    try:
+        return base64.b64decode(payload)
+    except Exception:
+        return None
+
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+)
+# Every signature is decided by this many leading bytes (WebP's by bytes 8-11)
+SNIFF_BYTES = 12
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """Image format from the first bytes of a file (None if unrecognized)"""
+    for signature, kind in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return kind
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+def decode_image(data: bytes, max_dim: int) -> Image.Image:
+    """Decode image bytes, letting JPEG skip straight to roughly max_dim"""
+    img = Image.open(io.BytesIO(data))
+    img.draft("RGB", (max_dim, max_dim))
+    img = ImageOps.exif_transpose(img)
+    return img.convert("RGB")
+
+def encode_image(img: Image.Image, max_dim: int, quality: int) -> NormalizedImage:
+    """Downscale a decoded image to max_dim and encode it as a metadata-free JPEG"""
+    img = img.copy()
+    img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+
+    out = io.BytesIO()
+    # A fresh save without exif/icc arguments writes no metadata
+    img.save(out, format="JPEG", quality=quality, optimize=True)
+    data = out.getvalue()
+    return NormalizedImage(data, img.width, img.height, image_key(data))
+
+def normalize_image(data: bytes, max_dim: int = 512, quality: int = 85) -> NormalizedImage:
+    """Downscale to max_dim, drop metadata and re-encode as JPEG"""
+    return encode_image(decode_image(data, max_dim), max_dim, quality)
+
+def crop_plate_regions(data: bytes, max_dim: int = 512, quality: int = 85, max_regions: int = 3) -> List[NormalizedImage]:
+    """Decode once, find likely plate regions and normalize each crop, best first"""
+    img = decode_image(data, DETECT_DECODE_DIM)
+    return [encode_image(img.crop(box), max_dim, quality) for box in find_plate_regions(img, max_regions)]
+
+def tile_boxes(width: int, height: int, cols: int, rows: int, overlap: float) -> List[Tuple[int, int, int, int]]:
+    """A cols x rows grid of boxes covering the image, each overlapping its neighbours by `overlap` of a tile"""
+    tile_w = width / (cols - (cols - 1) * overlap)
+    tile_h = height / (rows - (rows - 1) * overlap)
+    boxes = []
+    for row in range(rows):
+        for col in range(cols):
+            left = col * tile_w * (1 - overlap)
+            top = row * tile_h * (1 - overlap)
+            boxes.append((round(left), round(top), min(width, round(left + tile_w)), min(height, round(top + tile_h))))
+    return boxes
+
+def tile_frame(
+    data: bytes,
+    grid: Tuple[int, int] = (3, 2),
+    overlap: float = 0.2,
+    min_dim: int = 1600,
+    max_dim: int = 512,
+    quality: int = 85,
+) -> Optional[Tuple[NormalizedImage, List[NormalizedImage], List[Tuple[int, int, int, int]]]]:
+    """
+    Decode a large frame once and normalize both the whole frame and a grid
+    of overlapping tiles (cols x rows, turned for portrait frames), so each
+    tile keeps the resolution the whole frame loses in the downscale.
+    Returns (frame, tiles, tile boxes), or None for frames whose longer side
+    is under min_dim.
+    """
+    with Image.open(io.BytesIO(data)) as probe:
+        width, height = probe.size
+    if max(width, height) < min_dim:
+        return None
+    cols, rows = grid
+    # Tiles only need max_dim pixels each, so the frame is scaled once to the
+    # size the grid needs rather than every tile from full resolution
+    across = max(cols, rows)
+    span = math.ceil(max_dim * (across - (across - 1) * overlap))
+    img = decode_image(data, math.ceil(span * min(width, height) / max(width, height)))
+    scale = span / max(img.size)
+    if scale < 1:
+        img = img.resize((round(img.width * scale), round(img.height * scale)), Image.Resampling.LANCZOS)
+    if img.height > img.width:
+        cols, rows = rows, cols
+    boxes = tile_boxes(img.width, img.height, cols, rows, overlap)
+    return encode_image(img, max_dim, quality), [encode_image(img.crop(box), max_dim, quality) for box in boxes], boxes
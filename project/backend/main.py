@@ -1,47 +1,105 @@
+import asyncio
 import base64
-import imghdr
+import contextlib
+import hashlib
 import os
-import re
+import threading
+import time
 from typing import Optional, List, Dict
 from datetime import date, datetime
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from openai import OpenAI
+import deadline
+from admission import AdmissionController, Overloaded
+from deadline import DeadlineExceeded, DeadlineMiddleware
+from image_ingest import InvalidImage, decode_base64_image
+from image_pipeline import (
+    SNIFF_BYTES, crop_plate_regions, image_bytes_from_ref, normalize_image, sniff_image_type, tile_frame,
+)
+from ocr_backends import OpenAIBackend, merge_plate_reads, open_ocr_backend
+from ocr_batcher import OCRBatcher
+from ocr_cache import OCRCache, image_key
+from scan_session import ScanSession
+from singleflight import SingleFlight
+from timings import FAST_BUCKETS_MS, STAGE_BUCKETS_MS, StageTimings
+from metrics import Exposition, MetricsRegistry, timed
+from profiling import ProfilingMiddleware
+from models import LicensePlate
+from plate_store import open_plate_store
+from fuzzy_index import FuzzyPlateIndex
+from hotlist_index import HotlistIndex
+from plate_io import LineTooLong, export_csv, export_ndjson, import_plates
+from plate_json import PlateJSONCache, dumps, encode_suffix
 
 app = FastAPI(title="Plate OCR")
 
+# Histograms and counters exported on /metrics
+metrics = MetricsRegistry()
+
+# Opt-in request profiling: a sampled fraction of requests, or any request with
+# `X-Profile: <PROFILE_TOKEN>`, is run under cProfile and written to PROFILE_DIR.
+# The middleware is not installed at all unless one of the two is enabled.
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "100"))
+if PROFILE_SAMPLE_RATE > 0 or PROFILE_TOKEN:
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=PROFILE_DIR, sample_rate=PROFILE_SAMPLE_RATE, token=PROFILE_TOKEN, keep=PROFILE_KEEP,
+    )
+
+# Per-request deadline: the client's X-Deadline-Ms budget, capped at
+# OCR_DEADLINE_MS, bounds every upstream call made for the request
+OCR_DEADLINE_MS = float(os.getenv("OCR_DEADLINE_MS", "15000"))
+app.add_middleware(DeadlineMiddleware, header="x-deadline-ms", default_ms=OCR_DEADLINE_MS)
+
 # Get OpenAI API key from environment variable
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY environment variable is required")
-
-client = OpenAI(api_key=OPENAI_API_KEY)
-PLATE_EXTRACTION_PROMPT = """
-Analyze this image of a license plate and extract ONLY the license plate number.
-Rules:
-- Return only the alphanumeric characters on the plate
-- Remove any spaces, dashes, or special characters
-- If multiple plates are visible, return the most prominent one
-- If no license plate is clearly visible, return "NONE"
-- Maximum 10 characters
-- Return just the plate number, nothing else
-"""
-CLEAN_RE = re.compile(r"[^A-Z0-9 ]+")
-
-# License Plate Data Models
-class LicensePlate(BaseModel):
-    plate_number: str
-    owner_name: str
-    dob: date
-    has_warrant: bool
-    warrant_reason: Optional[str]
-    registration_date: date
-    is_stolen: bool
 
-# In-memory database
-license_plates_db: Dict[str, LicensePlate] = {
-    'ABC1234': LicensePlate(
+# OCR engine: "openai" (vision model, needs OPENAI_API_KEY), "tesseract" (local CPU)
+# or "cascade" (tesseract first, low-confidence reads escalate to openai)
+OCR_BACKEND = os.getenv("OCR_BACKEND", "openai").lower()
+OCR_MODEL = os.getenv("OCR_MODEL", "gpt-4o-mini")
+CASCADE_MIN_CONFIDENCE = float(os.getenv("CASCADE_MIN_CONFIDENCE", "0.85"))
+CASCADE_KNOWN_CONFIDENCE = float(os.getenv("CASCADE_KNOWN_CONFIDENCE", "0.6"))
+# Upstream vision client: every call is bounded by the request's deadline;
+# with OCR_HEDGE a duplicate call is fired once a call outlives the recent p95
+OCR_UPSTREAM = {
+    "timeout": float(os.getenv("OCR_TIMEOUT", "30")),
+    "connect_timeout": float(os.getenv("OCR_CONNECT_TIMEOUT", "2")),
+    "max_retries": int(os.getenv("OCR_MAX_RETRIES", "1")),
+    "pool_size": int(os.getenv("OCR_POOL_SIZE", "100")),
+    "keepalive": float(os.getenv("OCR_KEEPALIVE", "60")),
+    "hedge": os.getenv("OCR_HEDGE", "false").lower() in ("1", "true", "yes"),
+    "hedge_percentile": float(os.getenv("OCR_HEDGE_PERCENTILE", "95")),
+    "hedge_min_ms": float(os.getenv("OCR_HEDGE_MIN_MS", "50")),
+}
+# Optional CPU plate-region detector: only crops are sent upstream, and
+# frames without any candidate region never leave the server
+PLATE_DETECTOR = os.getenv("PLATE_DETECTOR", "false").lower() in ("1", "true", "yes")
+PLATE_DETECTOR_MAX_REGIONS = int(os.getenv("PLATE_DETECTOR_MAX_REGIONS", "3"))
+
+# Local Tesseract engine ("tesseract" and "cascade" backends)
+OCR_LOCAL = {
+    "max_regions": PLATE_DETECTOR_MAX_REGIONS,
+    "min_confidence": float(os.getenv("TESSERACT_MIN_CONFIDENCE", "0.3")),
+    "tesseract_cmd": os.getenv("TESSERACT_CMD"),
+}
+ocr_backend = open_ocr_backend(
+    OCR_BACKEND, OPENAI_API_KEY, OCR_MODEL, OCR_UPSTREAM, OCR_LOCAL,
+    **({
+        "min_confidence": CASCADE_MIN_CONFIDENCE,
+        "known_confidence": CASCADE_KNOWN_CONFIDENCE,
+        # Resolved at call time: the plate store is opened further down
+        "is_known": lambda plate: lookup_plate(plate) is not None,
+    } if OCR_BACKEND == "cascade" else {})
+)
+
+# Demo records loaded into a freshly created plate store
+SEED_PLATES: List[LicensePlate] = [
+    LicensePlate(
         plate_number='ABC1234',
         owner_name='John Doe',
         dob=date(1985, 6, 15),
@@ -50,7 +108,7 @@ license_plates_db: Dict[str, LicensePlate] = {
         registration_date=date(2020, 1, 10),
         is_stolen=False
     ),
-    'XYZ789': LicensePlate(
+    LicensePlate(
         plate_number='XYZ789',
         owner_name='Jane Smith',
         dob=date(1990, 11, 22),
@@ -59,7 +117,7 @@ license_plates_db: Dict[str, LicensePlate] = {
         registration_date=date(2019, 3, 5),
         is_stolen=False
     ),
-    'LMN456': LicensePlate(
+    LicensePlate(
         plate_number='LMN456',
         owner_name='Alice Johnson',
         dob=date(1978, 2, 28),
@@ -68,7 +126,7 @@ license_plates_db: Dict[str, LicensePlate] = {
         registration_date=date(2021, 7, 19),
         is_stolen=True
     ),
-    'DEF321': LicensePlate(
+    LicensePlate(
         plate_number='DEF321',
         owner_name='Bob Brown',
         dob=date(2000, 12, 12),
@@ -77,10 +135,90 @@ license_plates_db: Dict[str, LicensePlate] = {
         registration_date=date(2018, 9, 30),
         is_stolen=False
     )
-}
+]
+
+# Plate storage: "sqlite" (durable, indexed), "memory" (process-local dict),
+# "compact" (process-local columnar arrays for very large hotlists) or
+# "snapshot" (one memory-mapped file shared by every worker)
+PLATE_STORE = os.getenv("PLATE_STORE", "sqlite").lower()
+PLATE_DB_PATH = os.getenv("PLATE_DB_PATH", "plates.db")
+snapshot_options = {}
+if PLATE_STORE == "snapshot":
+    snapshot_options = {
+        "sync_interval": float(os.getenv("PLATE_SNAPSHOT_SYNC_MS", "500")) / 1000,
+        "compact_bytes": int(os.getenv("PLATE_SNAPSHOT_COMPACT_MB", "64")) * 1024 * 1024,
+    }
+plate_store = open_plate_store(PLATE_STORE, PLATE_DB_PATH, **snapshot_options)
+if plate_store.is_new:
+    for seed_plate in SEED_PLATES:
+        plate_store.add(seed_plate)
+
+# Near-match index so OCR slips (O/0, I/1, B/8, S/5...) are reported as
+# candidate plates on a miss. FUZZY_CONFUSION_MATCH alone suggests plates that
+# differ only by confusable characters; FUZZY_MATCH_DISTANCE also allows that
+# many further edits. Both are off by default.
+FUZZY_MATCH_DISTANCE = int(os.getenv("FUZZY_MATCH_DISTANCE", "0"))
+FUZZY_CONFUSION_MATCH = os.getenv("FUZZY_CONFUSION_MATCH", "false").lower() in ("1", "true", "yes")
+FUZZY_MATCHING = FUZZY_MATCH_DISTANCE > 0 or FUZZY_CONFUSION_MATCH
+FUZZY_MAX_CANDIDATES = int(os.getenv("FUZZY_MAX_CANDIDATES", "5"))
+fuzzy_index = FuzzyPlateIndex(max(0, FUZZY_MATCH_DISTANCE))
 
+# Bloom filter of stored plates plus alert flags: "not on any list" answers
+# and alert checks skip the store
+hotlist_index = HotlistIndex(max(1_000_000, 2 * plate_store.count()))
 
+# Bumped whenever the indexes are reset, so a build that overlapped a reset
+# starts over instead of marking stale indexes ready
+plate_index_build = {"generation": 0, "running": True}
+plate_index_lock = threading.Lock()
 
+def build_plate_indexes(indexes, batch_size: int = 10000) -> None:
+    """Load derived lookup indexes from the store in one pass, then mark them ready"""
+    generation = plate_index_build["generation"]
+    while True:
+        batch = []
+        for plate in plate_store.iter_records(batch_size):
+            batch.append(plate)
+            if len(batch) >= batch_size:
+                for index in indexes:
+                    index.plates_added(batch)
+                batch = []
+        for index in indexes:
+            index.plates_added(batch)
+        with plate_index_lock:
+            if plate_index_build["generation"] == generation:
+                for index in indexes:
+                    index.mark_ready()
+                plate_index_build["running"] = False
+                return
+            generation = plate_index_build["generation"]
+            for index in indexes:
+                index.reset()
+
+def sync_plate_indexes() -> None:
+    """
+    Apply writes made by other processes (SQLite with several workers, or
+    outside tools) to the derived indexes; called once per request before
+    its lookups. The store replays them to the listeners. Only a worker too
+    far behind for that rebuilds the indexes, and until the rebuild is done
+    they are not ready and answers come from the store.
+    """
+    if not plate_store.catch_up():
+        return
+    with plate_index_lock:
+        plate_index_build["generation"] += 1
+        for index in plate_indexes + [plate_json_cache]:
+            index.reset()
+        if plate_index_build["running"]:
+            return
+        plate_index_build["running"] = True
+    threading.Thread(target=build_plate_indexes, args=(plate_indexes,), daemon=True).start()
+
+plate_indexes = [hotlist_index] + ([fuzzy_index] if FUZZY_MATCHING else [])
+for plate_index in plate_indexes:
+    plate_store.add_listener(plate_index)
+# Large hotlists take a while to index; the store answers everything in the meantime
+threading.Thread(target=build_plate_indexes, args=(plate_indexes,), daemon=True).start()
 
 class ExtractResponse(BaseModel):
     plate: str
@@ -102,152 +240,401 @@ class PlateSearchResult(BaseModel):
     data: Optional[LicensePlateResponse] = None
     alerts: List[str] = []
 
+def store_timer(op: str):
+    return timed(metrics.histogram(
+        "plate_store_operation_seconds", "Latency of plate-store operations", FAST_BUCKETS_MS, op=op
+    ))
+
 # Utility functions for license plate operations
+@store_timer("lookup")
 def lookup_plate(plate_number: str) -> Optional[LicensePlate]:
-    """Look up a license plate in the in-memory database"""
-    return license_plates_db.get(plate_number.upper())
+    """
+    Look up a license plate in the plate store; request handlers call
+    sync_plate_indexes() first so a Bloom filter negative covers other
+    processes' writes
+    """
+    if not hotlist_index.might_contain(plate_number):
+        return None
+    return plate_store.lookup(plate_number)
 
+@store_timer("add")
 def add_plate(plate_data: LicensePlate) -> bool:
     """Add a new license plate to the database"""
-    license_plates_db[plate_data.plate_number.upper()] = plate_data
-    return True
+    return plate_store.add(plate_data)
 
+@store_timer("remove")
 def remove_plate(plate_number: str) -> bool:
     """Remove a license plate from the database"""
-    plate_key = plate_number.upper()
-    if plate_key in license_plates_db:
-        del license_plates_db[plate_key]
-        return True
-    return False
+    return plate_store.remove(plate_number)
 
+@store_timer("all")
 def get_all_plates() -> List[LicensePlate]:
     """Get all license plates from the database"""
-    return list(license_plates_db.values())
+    return plate_store.all_plates()
 
-def search_plates_with_alerts(plate_number: str) -> PlateSearchResult:
-    """Search for a plate and return any alerts"""
-    plate = lookup_plate(plate_number)
-    if not plate:
-        return PlateSearchResult(found=False)
-    
+page_plates = store_timer("page")(plate_store.page_plates)
+
+# Encoded JSON of recently matched records, spliced straight into responses
+PLATE_JSON_CACHE_SIZE = int(os.getenv("PLATE_JSON_CACHE_SIZE", "10000"))
+plate_json_cache = PlateJSONCache(PLATE_JSON_CACHE_SIZE)
+plate_store.add_listener(plate_json_cache)
+EXACT_MATCH_SUFFIX = encode_suffix({"match": "exact"})
+
+def match_plate(plate_number: str) -> Optional[bytes]:
+    """Encoded JSON object for the exact record of plate_number, or None"""
+    record = plate_json_cache.record(plate_number, lookup_plate)
+    if record is None:
+        return None
+    return record + EXACT_MATCH_SUFFIX
+
+def plate_candidates(plate_number: str) -> List[Dict]:
+    """
+    Stored plates the OCR reading may have been, nearest first. They are only
+    suggestions: a record is never returned for a reading that does not match
+    it exactly.
+    """
+    if not FUZZY_MATCHING or plate_number == "UNKNOWN":
+        return []
+    candidates = []
+    for number, distance in fuzzy_index.candidates(plate_number, FUZZY_MAX_CANDIDATES):
+        # The index can briefly lag a delete, so confirm against the store
+        if lookup_plate(number) is not None:
+            candidates.append({"plate_number": number, "distance": distance})
+    return candidates
+
+def plate_alerts(plate: LicensePlate) -> List[str]:
     alerts = []
     if plate.has_warrant:
         alerts.append(f"WARRANT: {plate.warrant_reason}")
     if plate.is_stolen:
         alerts.append("STOLEN VEHICLE")
+    return alerts
+
+def search_plates_with_alerts(plate_number: str) -> PlateSearchResult:
+    """Search for a plate and return any alerts"""
+    sync_plate_indexes()
+    plate = lookup_plate(plate_number)
+    if not plate:
+        return PlateSearchResult(found=False)
     
-    return PlateSearchResult(
+    # Stored records are already valid, so skip a dump/validate round trip
+    return PlateSearchResult.model_construct(
         found=True,
-        data=LicensePlateResponse(**plate.model_dump()),
-        alerts=alerts
+        data=LicensePlateResponse.model_construct(**dict(plate)),
+        alerts=plate_alerts(plate)
     )
 
 def todata_url(image_bytes: bytes) -> str:
-    # Try to guess the image type (fallback to png)
-    kind = imghdr.what(None, h=image_bytes) or "png"
+    # Guess the image type from its signature (fallback to png)
+    kind = sniff_image_type(image_bytes[:16]) or "png"
     b64 = base64.b64encode(image_bytes).decode("ascii")
     return f"data:image/{kind};base64,{b64}"
 
-def askopenai(image_ref: str) -> str:
+# Micro-batching of concurrent single-plate OCR calls (disabled when the window is 0)
+OCR_BATCH_WINDOW_MS = float(os.getenv("OCR_BATCH_WINDOW_MS", "0"))
+OCR_BATCH_MAX = int(os.getenv("OCR_BATCH_MAX", "8"))
+ocr_batcher = OCRBatcher(ocr_backend.read_plate_batch, OCR_BATCH_WINDOW_MS, OCR_BATCH_MAX) if OCR_BATCH_WINDOW_MS > 0 else None
+
+async def ocr_plate(image_ref: str) -> str:
+    """Single-plate OCR, coalesced with concurrent requests when batching is on"""
+    if ocr_batcher is not None:
+        return await ocr_batcher.submit(image_ref)
+    return await ocr_backend.read_plate(image_ref)
+
+# Identical images already being OCRed share the in-flight upstream call
+ocr_singleflight = SingleFlight()
+
+# Admission control: OCR requests beyond OCR_MAX_CONCURRENCY wait in a queue
+# of OCR_MAX_QUEUE for up to OCR_QUEUE_TIMEOUT_MS; the rest are shed with
+# 429 (queue full) or 503 (wait expired) and a Retry-After header
+OCR_MAX_CONCURRENCY = int(os.getenv("OCR_MAX_CONCURRENCY", "32"))
+OCR_MAX_QUEUE = int(os.getenv("OCR_MAX_QUEUE", "64"))
+OCR_QUEUE_TIMEOUT_MS = float(os.getenv("OCR_QUEUE_TIMEOUT_MS", "2000"))
+ocr_admission = AdmissionController(OCR_MAX_CONCURRENCY, OCR_MAX_QUEUE, OCR_QUEUE_TIMEOUT_MS / 1000)
+
+def shed_response(e: Overloaded) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+
+def image_digest(image_ref: str) -> bytes:
+    return hashlib.blake2b(image_ref.encode("ascii", "replace"), digest_size=16).digest()
+
+# OCR result caches keyed on an exact digest of the normalized frame
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "256"))
+OCR_CACHE_TTL = float(os.getenv("OCR_CACHE_TTL", "10"))
+ocr_cache = OCRCache(OCR_CACHE_SIZE, OCR_CACHE_TTL)
+ocr_list_cache = OCRCache(OCR_CACHE_SIZE, OCR_CACHE_TTL)
+
+# Normalization applied to inline images before they are sent upstream
+OCR_MAX_IMAGE_DIM = int(os.getenv("OCR_MAX_IMAGE_DIM", "512"))
+OCR_JPEG_QUALITY = int(os.getenv("OCR_JPEG_QUALITY", "85"))
+
+async def prepare_image(image_ref: Optional[str], image_data: Optional[bytes], timings: StageTimings):
     """
-    Call OpenAI with a single instruction + one image.
-    image_ref: either http(s) URL or a data: URL (base64).
+    Decode an inline image once, downscale and re-encode it for upstream.
+    Returns (image_ref, image_hash); http(s) URLs pass through unhashed.
     """
-    # Prompt keeps it deterministic and asks for only the plate text.
-    prompt = (
-        "Extract ONLY the license plate text (letters/numbers/spaces). "
-        "No extra words, no state names. If nothing is legible, reply with 'UNKNOWN'."
-        "If there is a dash in the plate, ommit the dash. "
-        "If this is not a license plate, reply with 'UNKNOWN'."
-    )
+    if image_data is None:
+        image_data = image_bytes_from_ref(image_ref)
+        if image_data is None:
+            return image_ref, None
     
-    # Responses API with a vision model
-    # (Images may be passed via URL or Base64 data URL.)
-    resp = client.responses.create(
-        model="gpt-4o-mini",
-        input=[
-            {
-                "role": "user",
-                "content": [
-                    {"type": "input_text", "text": prompt},
-                    {"type": "input_image", "image_url": image_ref, "detail": "low"},
-                ],
-            }
-        ],
-        temperature=0,
-        max_output_tokens=32,
-    )
+    try:
+        with timings.stage("normalize"):
+            normalized = await asyncio.to_thread(normalize_image, image_data, OCR_MAX_IMAGE_DIM, OCR_JPEG_QUALITY)
+    except Exception:
+        # Not something Pillow can read; forward it untouched and skip the cache
+        return image_ref or todata_url(image_data), None
     
-    # SDK exposes a convenience string:
-    # (If unavailable in your SDK version, fall back to parsing the first text item.)
-    text = getattr(resp, "output_text", None)
-    if not text:
-        # fallback parser
-        try:
-            parts = resp.output[0].content # type: ignore[attr-defined]
-            text = "".join(p.text for p in parts if getattr(p, "type", "") == "output_text")
-        except Exception:
-            text = ""
+    timings.note("normalize", f"{len(image_data)}->{len(normalized.data)} bytes")
+    with timings.stage("encode"):
+        return todata_url(normalized.data), normalized.image_hash
+
+async def detect_plate_crops(image_ref: Optional[str], image_data: Optional[bytes], timings: StageTimings):
+    """
+    Run the plate-region detector on an inline image.
+    Returns a list of (image_ref, image_hash) crops, best first, or None when
+    detection is disabled or cannot run on this input.
+    """
+    if not PLATE_DETECTOR:
+        return None
+    if image_data is None:
+        image_data = image_bytes_from_ref(image_ref)
+        if image_data is None:
+            return None
     
-    text = text.strip().upper()
-    # Keep only plate-ish characters
-    text = CLEAN_RE.sub("", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text or "UNKNOWN"
+    try:
+        with timings.stage("detect"):
+            crops = await asyncio.to_thread(
+                crop_plate_regions, image_data, OCR_MAX_IMAGE_DIM, OCR_JPEG_QUALITY, PLATE_DETECTOR_MAX_REGIONS
+            )
+    except Exception:
+        return None
+    
+    timings.note("detect", f"{len(crops)} regions")
+    with timings.stage("encode"):
+        return [(todata_url(crop.data), crop.image_hash) for crop in crops]
+
+async def cached_ocr_plate(image_ref: str, image_hash: Optional[bytes] = None) -> str:
+    """Single-plate OCR behind the result cache and in-flight dedupe"""
+    if image_hash is not None:
+        cached = ocr_cache.get(image_hash)
+        if cached is not None:
+            return cached
+    
+    plate = await ocr_singleflight.do(("plate", image_digest(image_ref)), lambda: ocr_plate(image_ref))
+    if image_hash is not None:
+        ocr_cache.put(image_hash, plate)
+    return plate
 
-import json
-import re
-from typing import List
+async def cached_ocr_plate_list(image_ref: str, image_hash: Optional[bytes] = None) -> List[str]:
+    """Multi-plate OCR behind the result cache and in-flight dedupe"""
+    if image_hash is not None:
+        cached = ocr_list_cache.get(image_hash)
+        if cached is not None:
+            return list(cached)
+    
+    plates = await ocr_singleflight.do(("plate_list", image_digest(image_ref)), lambda: ocr_backend.read_plates(image_ref))
+    if image_hash is not None:
+        ocr_list_cache.put(image_hash, list(plates))
+    return list(plates)
 
-def askopenai_list(image_ref: str) -> List[str]:
+async def recognize_plate(image_ref: Optional[str], image_data: Optional[bytes], timings: StageTimings) -> str:
+    """Single-plate OCR: detected crops in order of confidence, else the whole frame"""
+    crops = await detect_plate_crops(image_ref, image_data, timings)
+    if crops is not None:
+        if not crops:
+            return "UNKNOWN"
+        with timings.stage("ocr"):
+            for crop_ref, crop_hash in crops:
+                plate = await cached_ocr_plate(crop_ref, crop_hash)
+                if plate != "UNKNOWN":
+                    return plate
+        return "UNKNOWN"
+    
+    image_ref, image_hash = await prepare_image(image_ref, image_data, timings)
+    with timings.stage("ocr"):
+        return await cached_ocr_plate(image_ref, image_hash)
+
+# Tiled multi-plate OCR: frames whose longer side is at least OCR_TILE_MIN_DIM
+# are read as a grid of overlapping tiles plus the whole frame, all at once,
+# so distant plates survive the downscale and crowded scenes are split
+# across calls (0 disables)
+OCR_TILE_MIN_DIM = int(os.getenv("OCR_TILE_MIN_DIM", "0"))
+OCR_TILE_GRID = tuple(int(n) for n in os.getenv("OCR_TILE_GRID", "3x2").lower().split("x"))
+OCR_TILE_OVERLAP = float(os.getenv("OCR_TILE_OVERLAP", "0.2"))
+
+async def tile_plate_views(image_ref: Optional[str], image_data: Optional[bytes], timings: StageTimings):
     """
-    Call OpenAI with a single instruction + one image.
-    image_ref: either http(s) URL or a data: URL (base64).
+    (image_ref, image_hash, box) for the whole frame (box None) and each
+    tile of a large inline image, or None when tiling is off or the frame is
+    small.
     """
-    prompt = (
-        "You are receiving an image that may contain multiple license plates. "
-        "Extract ONLY the license plate texts (letters/numbers/spaces). "
-        "No extra words, no state names. If nothing is legible, reply with 'UNKNOWN'."
-        "If there is a dash in the plate, ommit the dash. "
-        "If this is not a license plate, reply with 'UNKNOWN'."
-        "Return the results as an array of strings, e.g. [\"ABC123\", \"XYZ789\"]"
-    )
+    if OCR_TILE_MIN_DIM <= 0:
+        return None
+    if image_data is None:
+        image_data = image_bytes_from_ref(image_ref)
+        if image_data is None:
+            return None
     
-    resp = client.responses.create(
-        model="gpt-4o-mini",
-        input=[
-            {
-                "role": "user",
-                "content": [
-                    {"type": "input_text", "text": prompt},
-                    {"type": "input_image", "image_url": image_ref, "detail": "low"},
-                ],
-            }
-        ],
-        temperature=0,
-        max_output_tokens=32,
-    )
+    try:
+        with timings.stage("tile"):
+            tiled = await asyncio.to_thread(
+                tile_frame, image_data, OCR_TILE_GRID, OCR_TILE_OVERLAP, OCR_TILE_MIN_DIM, OCR_MAX_IMAGE_DIM, OCR_JPEG_QUALITY
+            )
+    except Exception:
+        return None
+    if tiled is None:
+        return None
     
-    text = getattr(resp, "output_text", None)
-    if not text:
-        try:
-            parts = resp.output[0].content
-            text = "".join(p.text for p in parts if getattr(p, "type", "") == "output_text")
-        except Exception:
-            text = ""
+    frame, tiles, boxes = tiled
+    timings.note("tile", f"{len(tiles)} tiles")
+    with timings.stage("encode"):
+        return [(todata_url(view.data), view.image_hash, box) for view, box in zip([frame] + tiles, [None] + boxes)]
+
+async def recognize_all_plates(image_ref: Optional[str], image_data: Optional[bytes], timings: StageTimings) -> List[str]:
+    """
+    Multi-plate OCR: one call per detected crop, else one list call per tile
+    of a large frame, else one list call on the whole frame. The calls are
+    admitted together, holding one admission slot each; raises Overloaded
+    when shed.
+    """
+    crops = await detect_plate_crops(image_ref, image_data, timings)
+    if crops is not None:
+        if not crops:
+            return ["UNKNOWN"]
+        async with ocr_admission.admit(len(crops)):
+            with timings.stage("ocr"):
+                plates = await asyncio.gather(*(cached_ocr_plate(ref, image_hash) for ref, image_hash in crops))
+        return list(dict.fromkeys(plates))
     
-    text = text.strip()
+    views = await tile_plate_views(image_ref, image_data, timings)
+    if views is not None:
+        async with ocr_admission.admit(len(views)):
+            with timings.stage("ocr"):
+                reads = await asyncio.gather(*(cached_ocr_plate_list(ref, image_hash) for ref, image_hash, _ in views))
+        return merge_plate_reads(reads, [box for _, _, box in views])
     
+    image_ref, image_hash = await prepare_image(image_ref, image_data, timings)
+    async with ocr_admission.admit():
+        with timings.stage("ocr"):
+            return await cached_ocr_plate_list(image_ref, image_hash)
+
+FAKE_PLATE_DATA = {
+    "plate": "TJX 9717",
+    "owner_name": "Matias Pena",
+    "dob": "01/13/2004",
+    "has_warrant": True,
+    "registration_date": "09/28/2025",
+    "license_ex_date": "12/31/2025",
+    "warrant_reason": "Hello!",
+    "is_stolen": True
+}
+
+def record_request(pipeline: str, timings: StageTimings, status) -> None:
+    """Feed a finished request's stage timings and outcome into /metrics"""
+    for stage, ms in timings.stages:
+        metrics.histogram(
+            "plate_ocr_stage_seconds", "Time spent in each stage of the extract pipelines",
+            STAGE_BUCKETS_MS, pipeline=pipeline, stage=stage,
+        ).observe(ms)
+    metrics.inc("plate_ocr_requests_total", "Extract requests by pipeline and response status", pipeline=pipeline, status=status)
+
+async def single_plate_response(image_ref: Optional[str], image_data: Optional[bytes], timings: StageTimings):
+    """Recognize one plate and answer with its record (or the placeholder)"""
+    status = 500
     try:
-        result = json.loads(text)
-        if isinstance(result, list):
-            return [str(item).upper().replace("-", "").strip() for item in result if str(item).strip()]
+        try:
+            async with ocr_admission.admit():
+                plate = (await recognize_plate(image_ref, image_data, timings)).replace(" ", "")
+        except Overloaded as e:
+            status = e.status_code
+            raise shed_response(e)
+        except DeadlineExceeded as e:
+            status = 504
+            raise HTTPException(status_code=504, detail=str(e), headers=timings.headers())
+        
+        # Look up plate info
+        with timings.stage("lookup"):
+            sync_plate_indexes()
+            record = match_plate(plate)
+            candidates = plate_candidates(plate) if record is None else []
+        if record is not None:
+            status = 200
+            return Response(content=record, media_type="application/json", headers=timings.headers())
+        # return JSONResponse(status_code=404, content={"detail": f"License plate {plate} not found"})
+        status = 203
+        content = dict(FAKE_PLATE_DATA, match="none", ocr_plate=plate, candidates=candidates)
+        return JSONResponse(status_code=203, content=content, headers=timings.headers())
+    finally:
+        record_request("single_plate", timings, status)
+
+def all_plates_body(plates: List[str]) -> Optional[bytes]:
+    """Encoded JSON array with a record per recognized plate, or None if there are none"""
+    # Remove spaces and filter out UNKNOWN plates
+    valid_plates = [plate.replace(" ", "") for plate in plates if plate != "UNKNOWN"]
+    
+    if not valid_plates:
+        return None
+    
+    results = []
+    sync_plate_indexes()
+    
+    for plate in valid_plates:
+        # Look up plate info
+        record = match_plate(plate)
+        
+        if record is not None:
+            results.append(record)
         else:
-            return [str(result).upper().replace("-", "").strip()]
-    except json.JSONDecodeError:
-        if text.upper() == "UNKNOWN" or not text:
-            return ["UNKNOWN"]
-        return [text.upper().replace("-", "").strip()]
+            # Use fake data for plates not found
+            results.append(dumps({
+                "plate": plate,
+                "owner_name": "UNKNOWN",
+                "dob": "UNKNOWN",
+                "has_warrant": False,
+                "warrant_reason": "UNKNOWN",
+                "registration_date": "UNKNOWN",
+                "is_stolen": False,
+                "match": "none",
+                "candidates": plate_candidates(plate),
+            }))
+    
+    return b"[" + b",".join(results) + b"]"
+
+async def all_plates_response(image_ref: Optional[str], image_data: Optional[bytes], timings: StageTimings):
+    """Recognize every plate in the frame and answer with a record per plate"""
+    status = 500
+    try:
+        try:
+            plates = await recognize_all_plates(image_ref, image_data, timings)
+        except Overloaded as e:
+            status = e.status_code
+            raise shed_response(e)
+        except DeadlineExceeded as e:
+            status = 504
+            raise HTTPException(status_code=504, detail=str(e), headers=timings.headers())
+        with timings.stage("lookup"):
+            body = all_plates_body(plates)
+        if body is None:
+            status = 404
+            return JSONResponse(status_code=404, content={"detail": "No license plates found in image"}, headers=timings.headers())
+        status = 200
+        return Response(content=body, media_type="application/json", headers=timings.headers())
+    finally:
+        record_request("all_plates", timings, status)
+
+# Largest accepted image, raw or base64-decoded
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+def ingest_base64_image(base64_image: str, timings: Optional[StageTimings] = None) -> bytes:
+    """Decode a base64 image or data URL payload, rejecting it with the matching HTTP status"""
+    try:
+        if timings is None:
+            return decode_base64_image(base64_image, MAX_UPLOAD_BYTES)
+        with timings.stage("decode"):
+            return decode_base64_image(base64_image, MAX_UPLOAD_BYTES)
+    except InvalidImage as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
 @app.post("/extract", response_model=ExtractResponse)
 async def extract_plate(
@@ -266,89 +653,24 @@ async def extract_plate(
         raise HTTPException(status_code=400, detail="Provide only one input method: image_url, file, or base64_image.")
     
     
+    timings = StageTimings()
+    image_ref = None
+    image_data = None
     try:
         if image_url:
             image_ref = image_url
         elif base64_image:
-            # Handle base64 string
-            try:
-                # Clean up the base64 string first
-                base64_clean = base64_image.strip()
-                
-                # Check if it's already a data URL
-                if base64_clean.startswith('data:image/'):
-                    image_ref = base64_clean
-                else:
-                    # Remove any URL encoding artifacts
-                    import urllib.parse
-                    base64_clean = urllib.parse.unquote(base64_clean)
-                    
-                    # Remove any whitespace or newlines that might have been added
-                    base64_clean = ''.join(base64_clean.split())
-                    
-                    # Try to decode to validate it's valid base64
-                    try:
-                        decoded_data = base64.b64decode(base64_clean, validate=True)
-                    except Exception:
-                        raise HTTPException(status_code=400, detail="Invalid base64 encoding")
-                    
-                    # Check if decoded data is actually an image
-                    if len(decoded_data) < 100:  # Too small to be a real image
-                        raise HTTPException(status_code=400, detail="Base64 data too small to be a valid image")
-                    
-                    # Detect image type from the actual data
-                    image_type = imghdr.what(None, h=decoded_data)
-                    if not image_type:
-                        # Try common image signatures
-                        if decoded_data.startswith(b'\xFF\xD8\xFF'):
-                            image_type = 'jpeg'
-                        elif decoded_data.startswith(b'\x89PNG\r\n\x1a\n'):
-                            image_type = 'png'
-                        elif decoded_data.startswith(b'GIF87a') or decoded_data.startswith(b'GIF89a'):
-                            image_type = 'gif'
-                        else:
-                            image_type = 'jpeg'  # Default fallback
-                    
-                    # Create proper data URL
-                    image_ref = f"data:image/{image_type};base64,{base64_clean}"
-                    
-            except HTTPException:
-                raise
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Invalid base64 image data: {e}")
+            # The decoded bytes go straight to normalization; no data URL is rebuilt
+            image_data = ingest_base64_image(base64_image, timings)
         else:
             # Handle file upload
-            data = await file.read()
+            with timings.stage("read"):
+                data = await file.read()
             if not data:
                 raise HTTPException(status_code=400, detail="Empty file.")
-            image_ref = todata_url(data)
-        
-        plate = askopenai(image_ref).replace(" ", "")
+            image_data = data
         
-        plate_info = lookup_plate(plate)
-        if plate_info:
-            return JSONResponse(status_code=200, content={
-                "plate": plate,
-                "owner_name": plate_info.owner_name,
-                "dob": plate_info.dob.isoformat(),
-                "has_warrant": plate_info.has_warrant,
-                "warrant_reason": plate_info.warrant_reason,
-                "registration_date": plate_info.registration_date.isoformat(),
-                "is_stolen": plate_info.is_stolen
-            })
-        else:
-            fake_data = {
-            "plate": "TJX 9717",
-            "owner_name": "Matias Pena",
-            "dob": "01/13/2004",
-            "has_warrant": True,
-            "registration_date": "09/28/2025",
-            "license_ex_date": "12/31/2025",
-            "warrant_reason": "Hello!",
-            "is_stolen": True
-          }
-            # return JSONResponse(status_code=404, content={"detail": f"License plate {plate} not found"})
-            return JSONResponse(status_code=203, content=fake_data)
+        return await single_plate_response(image_ref, image_data, timings)
         # return JSONResponse(status_code=200, content=ExtractResponse(plate=plate).model_dump())
     except HTTPException:
         raise
@@ -358,81 +680,10 @@ async def extract_plate(
 @app.post("/extract-base64", response_model=ExtractResponse)
 async def extract_plate_base64(request: Base64ImageRequest):
     """Extract license plate from base64 image data (sent in request body)"""
+    timings = StageTimings()
     try:
-        base64_image = request.base64_image.strip()
-        
-        # Handle base64 string
-        try:
-            # Check if it's already a data URL
-            if base64_image.startswith('data:image/'):
-                image_ref = base64_image
-            else:
-                # Remove any URL encoding artifacts
-                import urllib.parse
-                base64_clean = urllib.parse.unquote(base64_image)
-                
-                # Remove any whitespace or newlines
-                base64_clean = ''.join(base64_clean.split())
-                
-                # Try to decode to validate it's valid base64
-                try:
-                    decoded_data = base64.b64decode(base64_clean, validate=True)
-                except Exception:
-                    raise HTTPException(status_code=400, detail="Invalid base64 encoding")
-                
-                # Check if decoded data is actually an image
-                if len(decoded_data) < 100:
-                    raise HTTPException(status_code=400, detail="Base64 data too small to be a valid image")
-                
-                # Detect image type from the actual data
-                image_type = imghdr.what(None, h=decoded_data)
-                if not image_type:
-                    # Try common image signatures
-                    if decoded_data.startswith(b'\xFF\xD8\xFF'):
-                        image_type = 'jpeg'
-                    elif decoded_data.startswith(b'\x89PNG\r\n\x1a\n'):
-                        image_type = 'png'
-                    elif decoded_data.startswith(b'GIF87a') or decoded_data.startswith(b'GIF89a'):
-                        image_type = 'gif'
-                    else:
-                        image_type = 'jpeg'  # Default fallback
-                
-                # Create proper data URL
-                image_ref = f"data:image/{image_type};base64,{base64_clean}"
-        
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid base64 image data: {e}")
-        
-        # Process the image
-        plate = askopenai(image_ref).replace(" ", "")
-        
-        # Look up plate info
-        plate_info = lookup_plate(plate)
-        if plate_info:
-            return JSONResponse(status_code=200, content={
-                "plate": plate,
-                "owner_name": plate_info.owner_name,
-                "dob": plate_info.dob.isoformat(),
-                "has_warrant": plate_info.has_warrant,
-                "warrant_reason": plate_info.warrant_reason,
-                "registration_date": plate_info.registration_date.isoformat(),
-                "is_stolen": plate_info.is_stolen
-            })
-        else:
-            fake_data = {
-            "plate": "TJX 9717",
-            "owner_name": "Matias Pena",
-            "dob": "01/13/2004",
-            "has_warrant": True,
-            "registration_date": "09/28/2025",
-            "license_ex_date": "12/31/2025",
-            "warrant_reason": "Hello!",
-            "is_stolen": True
-          }
-            # return JSONResponse(status_code=404, content={"detail": f"License plate {plate} not found"})
-            return JSONResponse(status_code=203, content=fake_data)
+        image_data = ingest_base64_image(request.base64_image, timings)
+        return await single_plate_response(None, image_data, timings)
             
     except HTTPException:
         raise
@@ -442,88 +693,180 @@ async def extract_plate_base64(request: Base64ImageRequest):
 @app.post("/extract-all-plates-base64", response_model=List[ExtractResponse])
 async def extract_all_plates_base64(request: Base64ImageRequest):
     """Extract all license plates from base64 image data (sent in request body)"""
+    timings = StageTimings()
     try:
-        base64_image = request.base64_image.strip()
-        
-        # Handle base64 string (same validation as original)
-        try:
-            if base64_image.startswith('data:image/'):
-                image_ref = base64_image
-            else:
-                import urllib.parse
-                base64_clean = urllib.parse.unquote(base64_image)
-                base64_clean = ''.join(base64_clean.split())
-                
-                try:
-                    decoded_data = base64.b64decode(base64_clean, validate=True)
-                except Exception:
-                    raise HTTPException(status_code=400, detail="Invalid base64 encoding")
-                
-                if len(decoded_data) < 100:
-                    raise HTTPException(status_code=400, detail="Base64 data too small to be a valid image")
-                
-                image_type = imghdr.what(None, h=decoded_data)
-                if not image_type:
-                    if decoded_data.startswith(b'\xFF\xD8\xFF'):
-                        image_type = 'jpeg'
-                    elif decoded_data.startswith(b'\x89PNG\r\n\x1a\n'):
-                        image_type = 'png'
-                    elif decoded_data.startswith(b'GIF87a') or decoded_data.startswith(b'GIF89a'):
-                        image_type = 'gif'
-                    else:
-                        image_type = 'jpeg'
-                
-                image_ref = f"data:image/{image_type};base64,{base64_clean}"
-                
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid base64 image data: {e}")
-        
-        # Process the image to get all plates
-        plates = askopenai_list(image_ref)
-        
-        # Remove spaces and filter out UNKNOWN plates
-        valid_plates = [plate.replace(" ", "") for plate in plates if plate != "UNKNOWN"]
-        
-        if not valid_plates:
-            return JSONResponse(status_code=404, content={"detail": "No license plates found in image"})
-        
-        results = []
-        
-        for plate in valid_plates:
-            # Look up plate info
-            plate_info = lookup_plate(plate)
-            
-            if plate_info:
-                results.append({
-                    "plate": plate,
-                    "owner_name": plate_info.owner_name,
-                    "dob": plate_info.dob.isoformat(),
-                    "has_warrant": plate_info.has_warrant,
-                    "warrant_reason": plate_info.warrant_reason,
-                    "registration_date": plate_info.registration_date.isoformat(),
-                    "is_stolen": plate_info.is_stolen
-                })
-            else:
-                # Use fake data for plates not found
-                results.append({
-                    "plate": plate,
-                    "owner_name": "UNKNOWN",
-                    "dob": "UNKNOWN",
-                    "has_warrant": False,
-                    "warrant_reason": "UNKNOWN",
-                    "registration_date": "UNKNOWN",
-                    "is_stolen": False
-                })
-        
-        return JSONResponse(status_code=200, content=results)
+        image_data = ingest_base64_image(request.base64_image, timings)
+        return await all_plates_response(None, image_data, timings)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process image: {e}")
+
+# Raw image bodies: no base64 inflation on the wire and no decode pass
+def check_image_type(body: bytes) -> None:
+    if sniff_image_type(bytes(body[:SNIFF_BYTES])) is None:
+        raise HTTPException(status_code=415, detail="Body is not a JPEG, PNG, GIF, BMP or WebP image")
+
+async def read_image_body(request: Request) -> bytes:
+    """
+    Stream a raw image request body, checking its type once its first
+    SNIFF_BYTES have arrived (however the body is chunked) and its size as
+    it arrives.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Image larger than {MAX_UPLOAD_BYTES} bytes")
     
+    body = bytearray()
+    sniffed = False
+    async for chunk in request.stream():
+        body += chunk
+        if not sniffed and len(body) >= SNIFF_BYTES:
+            check_image_type(body)
+            sniffed = True
+        if len(body) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"Image larger than {MAX_UPLOAD_BYTES} bytes")
+    if not sniffed and body:
+        check_image_type(body)
+    if len(body) < 100:  # Too small to be a real image
+        raise HTTPException(status_code=400, detail="Body too small to be a valid image")
+    return bytes(body)
+
+@app.post("/extract-raw", response_model=ExtractResponse)
+async def extract_plate_raw(request: Request):
+    """Extract license plate from a raw image body (application/octet-stream or image/*)"""
+    timings = StageTimings()
+    with timings.stage("read"):
+        image_data = await read_image_body(request)
+    try:
+        return await single_plate_response(None, image_data, timings)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to process image: {e}")
+
+@app.post("/extract-all-plates-raw", response_model=List[ExtractResponse])
+async def extract_all_plates_raw(request: Request):
+    """Extract all license plates from a raw image body (application/octet-stream or image/*)"""
+    timings = StageTimings()
+    with timings.stage("read"):
+        image_data = await read_image_body(request)
+    try:
+        return await all_plates_response(None, image_data, timings)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to process image: {e}")
+
+# Persistent auto-scan stream: one WebSocket per device instead of a POST per frame
+SCAN_REUSE_TTL = float(os.getenv("SCAN_REUSE_TTL", "30"))
+SCAN_REUSE_SIZE = int(os.getenv("SCAN_REUSE_SIZE", "32"))
+scan_sessions: set = set()
+# Frame counters of sessions that have already closed
+scan_totals = {"sessions": 0, "received": 0, "processed": 0, "dropped": 0, "reused": 0}
+
+def scan_stats() -> Dict:
+    stats = dict(scan_totals, active=len(scan_sessions))
+    for session in scan_sessions:
+        for key, value in session.stats().items():
+            stats[key] += value
+    return stats
+
+async def scan_frame_message(session: ScanSession, frame_id: int, data: bytes) -> bytes:
+    """Recognize one streamed frame and encode the result message"""
+    timings = StageTimings()
+    try:
+        with timings.stage("hash"):
+            image_hash = image_key(data)
+        # The same frame sent again in this session reuses the earlier answer;
+        # matching is exact, like the OCR cache, so a similar car never does
+        plates = session.cache.get(image_hash)
+        reused = plates is not None
+        if reused:
+            session.reused += 1
+        else:
+            with deadline.budget(OCR_DEADLINE_MS / 1000):
+                plates = await recognize_all_plates(None, data, timings)
+            session.cache.put(image_hash, list(plates))
+        with timings.stage("lookup"):
+            body = all_plates_body(plates) or b"[]"
+    except Overloaded as e:
+        record_request("scan", timings, e.status_code)
+        return dumps({"frame": frame_id, "error": e.detail, "retry_after": e.retry_after})
+    except Exception as e:
+        record_request("scan", timings, 504 if isinstance(e, DeadlineExceeded) else 500)
+        return dumps({"frame": frame_id, "error": f"Failed to process image: {e}"})
+    
+    record_request("scan", timings, 200)
+    header = dumps({
+        "frame": frame_id,
+        "reused": reused,
+        "dropped": session.dropped,
+        "timing": timings.server_timing(),
+    })
+    return header[:-1] + b',"plates":' + body + b"}"
+
+async def scan_worker(websocket: WebSocket, session: ScanSession) -> None:
+    """
+    Process the newest queued frame of a session and push its result.
+    A failed push closes the socket, which also ends the receive loop.
+    """
+    try:
+        while True:
+            frame_id, data = await session.get()
+            message = await scan_frame_message(session, frame_id, data)
+            session.processed += 1
+            await websocket.send_text(message.decode("utf-8"))
+    except Exception:
+        with contextlib.suppress(Exception):
+            await websocket.close(code=1011)
+        raise
+
+@app.websocket("/ws/scan")
+async def scan_stream(websocket: WebSocket):
+    """
+    Continuous auto-scan. Send frames as binary messages (raw JPEG/PNG) or
+    text messages (base64, optionally as {"base64_image": ...}); a JSON
+    result is pushed for each processed frame. Frames that arrive while OCR
+    is busy replace the queued one, so only the latest frame is processed.
+    """
+    await websocket.accept()
+    session = ScanSession(OCRCache(SCAN_REUSE_SIZE, SCAN_REUSE_TTL))
+    scan_totals["sessions"] += 1
+    scan_sessions.add(session)
+    worker = asyncio.create_task(scan_worker(websocket, session))
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                if message.get("bytes") is not None:
+                    data = message["bytes"]
+                    if sniff_image_type(data[:16]) is None:
+                        raise HTTPException(status_code=415, detail="Frame is not a JPEG, PNG, GIF, BMP or WebP image")
+                else:
+                    text = message.get("text") or ""
+                    if text.lstrip().startswith("{"):
+                        text = Base64ImageRequest.model_validate_json(text).base64_image
+                    data = ingest_base64_image(text)
+            except HTTPException as e:
+                await websocket.send_text(dumps({"error": e.detail}).decode("utf-8"))
+                continue
+            except Exception as e:
+                await websocket.send_text(dumps({"error": f"Invalid frame: {e}"}).decode("utf-8"))
+                continue
+            session.put(data)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        worker.cancel()
+        scan_sessions.discard(session)
+        for key, value in session.stats().items():
+            scan_totals[key] += value
+        # Retrieve the worker's outcome, so a failed push is not left unobserved
+        await asyncio.gather(worker, return_exceptions=True)
 
 @app.get("/plate/{plate_number}", response_model=PlateSearchResult)
 async def lookup_plate_info(plate_number: str):
@@ -533,25 +876,112 @@ async def lookup_plate_info(plate_number: str):
         raise HTTPException(status_code=404, detail="License plate not found")
     return result
 
+def encode_cursor(plate_number: str) -> str:
+    return base64.urlsafe_b64encode(plate_number.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.b64decode(cursor.encode("ascii"), altchars=b"-_", validate=True).decode("utf-8")
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def stream_plates_json(plates: List[LicensePlate]):
+    """Yield a JSON array of plates one record at a time"""
+    yield b"["
+    for index, plate in enumerate(plates):
+        if index:
+            yield b","
+        yield plate.model_dump_json().encode("utf-8")
+    yield b"]"
+
 @app.get("/plates", response_model=List[LicensePlateResponse])
-async def get_all_license_plates():
-    """Get all license plates in the database"""
-    plates = get_all_plates()
-    return [LicensePlateResponse(**plate.model_dump()) for plate in plates]
+async def get_all_license_plates(
+    limit: int = Query(default=100, ge=1, le=1000, description="Max plates per page"),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor value from the previous page"),
+    has_warrant: Optional[bool] = Query(default=None),
+    is_stolen: Optional[bool] = Query(default=None),
+    registered_from: Optional[date] = Query(default=None, description="Earliest registration date (inclusive)"),
+    registered_to: Optional[date] = Query(default=None, description="Latest registration date (inclusive)"),
+):
+    """
+    Get one page of license plates, ordered by plate number.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    after = decode_cursor(cursor) if cursor else ""
+    # One extra row tells us whether another page exists
+    plates = page_plates(
+        after, limit + 1,
+        has_warrant=has_warrant, is_stolen=is_stolen,
+        registered_from=registered_from, registered_to=registered_to,
+    )
+    headers = {}
+    if len(plates) > limit:
+        plates = plates[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(plates[-1].plate_number.upper())
+    return StreamingResponse(stream_plates_json(plates), media_type="application/json", headers=headers)
+
+@app.get("/health", response_model=dict)
+async def health():
+    """Cheap liveness check for container healthchecks"""
+    if not plate_store.ping():
+        raise HTTPException(status_code=503, detail="Plate store unavailable")
+    return {"status": "ok"}
 
 @app.post("/plate", response_model=dict)
 async def add_license_plate(plate_data: LicensePlate):
     """Add a new license plate to the database"""
-    success = add_plate(plate_data)
+    try:
+        # Off the event loop: a shared store may wait on another worker's lock
+        success = await asyncio.to_thread(add_plate, plate_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if success:
         return {"message": f"License plate {plate_data.plate_number} added successfully"}
     else:
         raise HTTPException(status_code=400, detail="Failed to add license plate")
 
+bulk_import_latency = metrics.histogram(
+    "plate_store_operation_seconds", "Latency of plate-store operations", FAST_BUCKETS_MS, op="bulk_import"
+)
+
+@app.post("/plates/bulk", response_model=dict)
+async def bulk_import_plates(
+    request: Request,
+    format: Optional[str] = Query(default=None, description="ndjson or csv (defaults from Content-Type)"),
+):
+    """Stream an NDJSON or CSV hotlist into the database in batched transactions"""
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    start = time.perf_counter()
+    try:
+        return await import_plates(plate_store, request.stream(), fmt)
+    except LineTooLong as e:
+        raise HTTPException(status_code=413, detail=f"{e}; {e.accepted} rows before it were imported")
+    finally:
+        bulk_import_latency.observe((time.perf_counter() - start) * 1000)
+
+@app.post("/plates/snapshot", response_model=dict)
+async def compact_plate_snapshot():
+    """Fold the write journal into a new plate snapshot that every worker swaps to"""
+    if not hasattr(plate_store, "compact"):
+        raise HTTPException(status_code=400, detail="PLATE_STORE is not snapshot")
+    await asyncio.to_thread(plate_store.compact)
+    return plate_store.stats()
+
+@app.get("/plates/export")
+async def bulk_export_plates(format: str = Query(default="ndjson", description="ndjson or csv")):
+    """Stream every plate record as NDJSON or CSV"""
+    if format == "csv":
+        return StreamingResponse(export_csv(plate_store), media_type="text/csv")
+    if format == "ndjson":
+        return StreamingResponse(export_ndjson(plate_store), media_type="application/x-ndjson")
+    raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+
 @app.delete("/plate/{plate_number}", response_model=dict)
 async def delete_license_plate(plate_number: str):
     """Remove a license plate from the database"""
-    success = remove_plate(plate_number)
+    success = await asyncio.to_thread(remove_plate, plate_number)
     if success:
         return {"message": f"License plate {plate_number} removed successfully"}
     else:
@@ -560,7 +990,97 @@ async def delete_license_plate(plate_number: str):
 @app.get("/plate/{plate_number}/alerts", response_model=List[str])
 async def get_plate_alerts(plate_number: str):
     """Get alerts for a specific license plate"""
-    result = search_plates_with_alerts(plate_number)
-    if not result.found:
+    # Flagged plates are answered from the hotlist index alone
+    sync_plate_indexes()
+    alerts = hotlist_index.alerts(plate_number)
+    if alerts is not None:
+        return alerts
+    plate = lookup_plate(plate_number)
+    if not plate:
         raise HTTPException(status_code=404, detail="License plate not found")
-    return result.alerts
\ No newline at end of file
+    return plate_alerts(plate)
+
+@app.get("/ocr/stats", response_model=dict)
+async def get_ocr_stats():
+    """Counters for the OCR cache, in-flight deduplication and request batching"""
+    return {
+        "cache": {"plate": ocr_cache.stats(), "plate_list": ocr_list_cache.stats()},
+        "singleflight": ocr_singleflight.stats(),
+        "backend": ocr_backend.stats(),
+        "batcher": ocr_batcher.stats() if ocr_batcher is not None else None,
+        "hotlist_index": hotlist_index.stats(),
+        "plate_json_cache": plate_json_cache.stats(),
+        "scan": scan_stats(),
+        "admission": ocr_admission.stats(),
+        "plate_snapshot": plate_store.stats() if PLATE_STORE == "snapshot" else None,
+        "fuzzy_index": {
+            "keys": len(fuzzy_index),
+            "ready": fuzzy_index.ready,
+            "max_distance": FUZZY_MATCH_DISTANCE,
+            "confusion_match": FUZZY_CONFUSION_MATCH,
+        },
+    }
+
+def upstream_backend() -> Optional[OpenAIBackend]:
+    """The vision-model client, directly or as the remote tier of the cascade"""
+    backend = getattr(ocr_backend, "remote", ocr_backend)
+    return backend if isinstance(backend, OpenAIBackend) else None
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text-format metrics: stage and store latencies, upstream usage, caches and queues"""
+    out = Exposition()
+    metrics.expose(out)
+
+    upstream = upstream_backend()
+    if upstream is not None:
+        for kind, histogram in upstream.upstream_latency.items():
+            out.histogram("plate_ocr_upstream_seconds", "Latency of vision-model calls", histogram, kind=kind)
+        out.counter("plate_ocr_upstream_calls_total", "Vision-model calls started", upstream.calls)
+        out.counter("plate_ocr_upstream_tokens_total", "Vision-model tokens used", upstream.input_tokens, direction="input")
+        out.counter("plate_ocr_upstream_tokens_total", "Vision-model tokens used", upstream.output_tokens, direction="output")
+        out.counter("plate_ocr_upstream_image_bytes_total", "Bytes of image data sent to the vision model", upstream.image_bytes_sent)
+        out.counter("plate_ocr_upstream_hedges_total", "Hedged duplicate vision-model calls", upstream.hedges)
+        out.counter("plate_ocr_upstream_hedge_wins_total", "Hedged calls that answered first", upstream.hedge_wins)
+        out.counter("plate_ocr_deadline_exceeded_total", "Vision-model calls abandoned at the request deadline", upstream.deadline_exceeded)
+    for tier, stats in getattr(ocr_backend, "tiers", {}).items():
+        out.histogram("plate_ocr_cascade_tier_seconds", "Latency of each OCR cascade tier", stats.latency, tier=tier)
+        out.counter("plate_ocr_cascade_accepted_total", "Reads answered by each OCR cascade tier", stats.accepted, tier=tier)
+
+    for name, cache in (("plate", ocr_cache), ("plate_list", ocr_list_cache)):
+        out.gauge("plate_ocr_cache_entries", "Entries in the OCR result caches", len(cache.entries), cache=name)
+        out.counter("plate_ocr_cache_hits_total", "OCR result cache hits", cache.hits, cache=name)
+        out.counter("plate_ocr_cache_misses_total", "OCR result cache misses", cache.misses, cache=name)
+    out.gauge("plate_json_cache_entries", "Pre-encoded plate records cached", len(plate_json_cache.entries))
+    out.counter("plate_json_cache_hits_total", "Pre-encoded plate record cache hits", plate_json_cache.hits)
+    out.counter("plate_json_cache_misses_total", "Pre-encoded plate record cache misses", plate_json_cache.misses)
+    out.gauge("plate_ocr_singleflight_in_flight", "Distinct OCR calls in flight", len(ocr_singleflight.inflight))
+    out.counter("plate_ocr_singleflight_deduplicated_total", "OCR calls answered by an identical in-flight call", ocr_singleflight.shared)
+    if ocr_batcher is not None:
+        out.counter("plate_ocr_batches_total", "Batched vision-model calls", ocr_batcher.batches)
+        out.counter("plate_ocr_batched_requests_total", "OCR requests sent in batched calls", ocr_batcher.requests)
+
+    out.gauge("plate_ocr_admission_running", "OCR requests holding a slot", ocr_admission.running)
+    out.gauge("plate_ocr_admission_queue_depth", "OCR requests waiting for a slot", len(ocr_admission.waiters))
+    out.gauge("plate_ocr_admission_max_concurrent", "OCR slots", ocr_admission.max_concurrent)
+    out.counter("plate_ocr_admission_admitted_total", "OCR requests admitted", ocr_admission.admitted)
+    out.counter("plate_ocr_admission_shed_total", "OCR requests shed", ocr_admission.shed_queue_full, reason="queue_full")
+    out.counter("plate_ocr_admission_shed_total", "OCR requests shed", ocr_admission.shed_timeout, reason="queue_timeout")
+    out.histogram("plate_ocr_admission_queue_wait_seconds", "Time queued OCR requests waited for a slot", ocr_admission.queue_wait)
+
+    scan = scan_stats()
+    out.gauge("plate_ocr_scan_sessions", "Open /ws/scan sessions", scan["active"])
+    for key in ("received", "processed", "dropped", "reused"):
+        out.counter("plate_ocr_scan_frames_total", "/ws/scan frames by outcome", scan[key], outcome=key)
+
+    if PLATE_STORE == "snapshot":
+        snapshot = plate_store.stats()
+        out.gauge("plate_snapshot_plates", "Plates in the mapped plate snapshot", snapshot["snapshot_plates"])
+        out.gauge("plate_snapshot_journal_bytes", "Bytes of plate writes journaled since the snapshot", snapshot["journal_bytes"])
+        out.counter("plate_snapshot_swaps_total", "Plate snapshots swapped in", snapshot["swaps"])
+
+    out.gauge("plate_hotlist_plates_indexed", "Plate numbers in the hotlist Bloom filters", sum(bloom.count for bloom in hotlist_index.filters))
+    out.gauge("plate_hotlist_flagged_plates", "Plates with warrant or stolen flags", len(hotlist_index.flags))
+    out.counter("plate_hotlist_fast_negatives_total", "Lookups answered by the Bloom filter alone", hotlist_index.negatives)
+    out.gauge("plate_fuzzy_index_keys", "Canonical keys in the fuzzy plate index", len(fuzzy_index))
+    return Response(content=out.text(), media_type="text/plain; version=0.0.4; charset=utf-8")
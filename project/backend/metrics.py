@@ -0,0 +1,112 @@
+"""
+Prometheus text-format metrics.
+
+`MetricsRegistry` owns the process's own latency histograms and counters;
+hot paths fetch their LatencyHistogram once and call observe(), which is
+a bisect and two additions. Gauges and histograms kept by other components
+(caches, admission queue, OCR backends) are read at scrape time and
+written into the same `Exposition`.
+"""
+
+import functools
+import time
+from typing import Dict, List, Tuple
+
+from timings import LATENCY_BUCKETS_MS, LatencyHistogram
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def format_labels(labels: Dict[str, object]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        text = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{text}"')
+    return "{" + ",".join(parts) + "}"
+
+def format_value(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+class Exposition:
+    """One scrape's worth of Prometheus text exposition"""
+
+    def __init__(self):
+        # Samples are grouped per metric family, as the format requires,
+        # whatever order they are added in
+        self.families: Dict[str, List[str]] = {}
+
+    def declare(self, name: str, kind: str, help: str) -> List[str]:
+        family = self.families.get(name)
+        if family is None:
+            family = self.families[name] = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        return family
+
+    def gauge(self, name: str, help: str, value, **labels) -> None:
+        self.declare(name, "gauge", help).append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+    def counter(self, name: str, help: str, value, **labels) -> None:
+        self.declare(name, "counter", help).append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+    def histogram(self, name: str, help: str, histogram: LatencyHistogram, **labels) -> None:
+        """A millisecond LatencyHistogram as a Prometheus histogram in seconds"""
+        family = self.declare(name, "histogram", help)
+        running = 0
+        for bound, count in zip(histogram.buckets_ms, histogram.counts):
+            running += count
+            family.append(f"{name}_bucket{format_labels(dict(labels, le=f'{bound / 1000:g}'))} {running}")
+        family.append(f"{name}_bucket{format_labels(dict(labels, le='+Inf'))} {histogram.count}")
+        family.append(f"{name}_sum{format_labels(labels)} {format_value(histogram.total_ms / 1000)}")
+        family.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+
+    def text(self) -> str:
+        return "\n".join(line for family in self.families.values() for line in family) + "\n"
+
+class MetricsRegistry:
+    """Named, labelled latency histograms and counters owned by this process"""
+
+    def __init__(self):
+        self.help: Dict[str, str] = {}
+        self.histograms: Dict[str, Dict[LabelKey, LatencyHistogram]] = {}
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+
+    def histogram(self, name: str, help: str, buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS, **labels) -> LatencyHistogram:
+        """The histogram for name and labels, created on first use"""
+        self.help.setdefault(name, help)
+        series = self.histograms.setdefault(name, {})
+        key = tuple(labels.items())
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = LatencyHistogram(buckets_ms)
+        return histogram
+
+    def inc(self, name: str, help: str, value: float = 1, **labels) -> None:
+        self.help.setdefault(name, help)
+        series = self.counters.setdefault(name, {})
+        key = tuple(labels.items())
+        series[key] = series.get(key, 0) + value
+
+    def expose(self, exposition: Exposition) -> None:
+        for name, series in self.histograms.items():
+            for key, histogram in series.items():
+                exposition.histogram(name, self.help[name], histogram, **dict(key))
+        for name, series in self.counters.items():
+            for key, value in series.items():
+                exposition.counter(name, self.help[name], value, **dict(key))
+
+def timed(histogram: LatencyHistogram):
+    """Decorator recording each call's duration (ms) of a sync function"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe((time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorate
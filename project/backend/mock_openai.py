@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Local mock of the OpenAI Responses API for benchmarks.
+
+Run it with uvicorn and point the backend at it:
+
+    uvicorn mock_openai:app --port 9000
+    OPENAI_BASE_URL=http://localhost:9000/v1 OPENAI_API_KEY=mock uvicorn main:app
+
+Latency is MOCK_LATENCY_MS plus an exponential jitter with mean
+MOCK_JITTER_MS; MOCK_SLOW_RATE of calls take MOCK_SLOW_MS instead.
+MOCK_ERROR_RATE of calls fail with 500 and MOCK_RATE_LIMIT_RATE with 429.
+Set MOCK_SEED for a reproducible sequence.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+MOCK_LATENCY_MS = float(os.getenv("MOCK_LATENCY_MS", "1000"))
+MOCK_JITTER_MS = float(os.getenv("MOCK_JITTER_MS", "0"))
+# Injected tail: this share of calls takes MOCK_SLOW_MS instead
+MOCK_SLOW_RATE = float(os.getenv("MOCK_SLOW_RATE", "0"))
+MOCK_SLOW_MS = float(os.getenv("MOCK_SLOW_MS", "5000"))
+MOCK_ERROR_RATE = float(os.getenv("MOCK_ERROR_RATE", "0"))
+MOCK_RATE_LIMIT_RATE = float(os.getenv("MOCK_RATE_LIMIT_RATE", "0"))
+MOCK_PLATE = os.getenv("MOCK_PLATE", "ABC1234")
+rng = random.Random(os.getenv("MOCK_SEED"))
+requests_served = 0
+errors_served = 0
+
+app = FastAPI(title="Mock OpenAI Responses API")
+
+def count_images(body: dict) -> int:
+    """Count input_image parts across every message of a Responses request"""
+    total = 0
+    for message in body.get("input") or []:
+        total += sum(1 for part in message.get("content") or [] if part.get("type") == "input_image")
+    return total
+
+def wants_list(body: dict) -> bool:
+    """True when the prompt asks for a JSON array of plates"""
+    for message in body.get("input") or []:
+        for part in message.get("content") or []:
+            if part.get("type") == "input_text" and "array" in part.get("text", ""):
+                return True
+    return False
+
+def latency_ms() -> float:
+    if rng.random() < MOCK_SLOW_RATE:
+        return MOCK_SLOW_MS
+    return MOCK_LATENCY_MS + (rng.expovariate(1 / MOCK_JITTER_MS) if MOCK_JITTER_MS > 0 else 0)
+
+def make_error(status_code: int, message: str, kind: str) -> JSONResponse:
+    """Error payload in the OpenAI API format"""
+    headers = {"retry-after": "1"} if status_code == 429 else None
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": kind, "param": None, "code": None}},
+        headers=headers,
+    )
+
+def make_response(text: str, model: str) -> dict:
+    """Build a minimal Responses API payload around an output text"""
+    return {
+        "id": f"resp_{uuid.uuid4().hex}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": model,
+        "status": "completed",
+        "output": [
+            {
+                "id": f"msg_{uuid.uuid4().hex}",
+                "type": "message",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {"input_tokens": 100, "output_tokens": 8, "total_tokens": 108},
+    }
+
+@app.post("/v1/responses")
+async def create_response(request: Request):
+    """Answer after the injected latency with MOCK_PLATE (one per image for batched calls), or an injected error"""
+    global requests_served, errors_served
+    requests_served += 1
+    body = await request.json()
+    await asyncio.sleep(latency_ms() / 1000)
+    roll = rng.random()
+    if roll < MOCK_ERROR_RATE:
+        errors_served += 1
+        return make_error(500, "Mock upstream error", "server_error")
+    if roll < MOCK_ERROR_RATE + MOCK_RATE_LIMIT_RATE:
+        errors_served += 1
+        return make_error(429, "Mock rate limit reached", "rate_limit_error")
+    images = count_images(body)
+    if images > 1:
+        text = json.dumps([MOCK_PLATE] * images)
+    elif wants_list(body):
+        text = json.dumps([MOCK_PLATE])
+    else:
+        text = MOCK_PLATE
+    return make_response(text, body.get("model", "mock"))
@@ -0,0 +1,13 @@
+from datetime import date
+from typing import Optional
+from pydantic import BaseModel
+
+# License Plate Data Models
+class LicensePlate(BaseModel):
+    plate_number: str
+    owner_name: str
+    dob: date
+    has_warrant: bool
+    warrant_reason: Optional[str]
+    registration_date: date
+    is_stolen: bool
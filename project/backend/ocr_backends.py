@@ -0,0 +1,645 @@
+"""
+OCR engines behind one interface.
+
+`OCRBackend` reads plate text from an image reference (http(s) URL or data:
+URL). `OpenAIBackend` is the original vision-model call; `TesseractBackend`
+runs entirely on the local CPU for offline sites, tests and low-latency crop
+scans; `CascadeBackend` tries the local engine first and escalates only
+low-confidence reads to the vision model. main.py picks one with the
+OCR_BACKEND setting.
+"""
+
+import asyncio
+import itertools
+import json
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+from PIL import Image, ImageOps
+
+import deadline
+from image_pipeline import DETECT_DECODE_DIM, decode_image, image_bytes_from_ref
+from plate_detector import find_plate_regions
+from timings import LatencyHistogram, LatencyWindow
+
+CLEAN_RE = re.compile(r"[^A-Z0-9 ]+")
+# Whole-plate sanity check applied to local reads before they are trusted
+PLATE_FORMAT_RE = re.compile(r"^[A-Z0-9]{2,8}$")
+# Complete JSON string literals, e.g. the whole entries of a truncated array
+JSON_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"')
+# Room for a crowded frame's list (each plate costs ~5 tokens)
+PLATE_LIST_MAX_TOKENS = 128
+
+def clean_plate_text(text: str) -> str:
+    """Normalize a single OCR answer to plate-ish characters"""
+    text = text.strip().upper()
+    # Keep only plate-ish characters
+    text = CLEAN_RE.sub("", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text or "UNKNOWN"
+
+def parse_plate_list(text: str) -> List[str]:
+    """
+    Plates from a list answer. A JSON array cut off by the token limit keeps
+    its complete entries; a bare plate is taken as is; anything else is
+    dropped rather than read as a plate.
+    """
+    text = text.strip()
+    try:
+        result = json.loads(text)
+    except json.JSONDecodeError:
+        if text.startswith("["):
+            result = [json.loads(item) for item in JSON_STRING_RE.findall(text)]
+        elif CLEAN_RE.sub("", text.upper().replace("-", "")) == text.upper().replace("-", ""):
+            result = [text]
+        else:
+            result = []
+    if not isinstance(result, list):
+        result = [result]
+    plates = [str(item).upper().replace("-", "").strip() for item in result if str(item).strip()]
+    return plates or ["UNKNOWN"]
+
+# A view's box in frame pixels (left, top, right, bottom); None is the whole frame
+Box = Optional[Tuple[float, float, float, float]]
+
+def boxes_overlap(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+def merge_plate_reads(reads: List[List[str]], boxes: Optional[List[Box]] = None) -> List[str]:
+    """
+    Combine plate lists read from overlapping views of one frame, in order of
+    first read, dropping UNKNOWN and repeats (ignoring spaces).
+
+    Given the views' boxes, a read that is part of a longer one is dropped as
+    a plate cut by a tile edge, but only if every view that read it is a tile
+    that did not read the longer plate too and overlaps a view that did. Two
+    nested plates read in the same view, or in the whole frame, are kept.
+    """
+    plates: Dict[str, str] = {}
+    views: Dict[str, List[int]] = {}
+    for view, view_reads in enumerate(reads):
+        for plate in view_reads:
+            key = plate.replace(" ", "").upper()
+            if not key or key == "UNKNOWN":
+                continue
+            plates.setdefault(key, plate)
+            if view not in views.setdefault(key, []):
+                views[key].append(view)
+
+    def cut_from(short: str, full: str) -> bool:
+        for view in views[short]:
+            box = boxes[view]
+            if box is None or view in views[full]:
+                return False
+            if not any(boxes[other] is None or boxes_overlap(box, boxes[other]) for other in views[full]):
+                return False
+        return True
+
+    if boxes is not None:
+        partial = {short for short in plates for full in plates if short != full and short in full and cut_from(short, full)}
+        plates = {key: plate for key, plate in plates.items() if key not in partial}
+    return list(plates.values()) or ["UNKNOWN"]
+
+def response_text(resp) -> str:
+    """Output text of a Responses API result"""
+    # SDK exposes a convenience string:
+    # (If unavailable in your SDK version, fall back to parsing the first text item.)
+    text = getattr(resp, "output_text", None)
+    if not text:
+        # fallback parser
+        try:
+            parts = resp.output[0].content # type: ignore[attr-defined]
+            text = "".join(p.text for p in parts if getattr(p, "type", "") == "output_text")
+        except Exception:
+            text = ""
+    return text
+
+class OCRBackend:
+    """Interface for plate OCR engines; answers are cleaned plate text or 'UNKNOWN'"""
+
+    name = "base"
+
+    async def read_plate(self, image_ref: str) -> str:
+        """The most prominent plate in the image"""
+        raise NotImplementedError
+
+    async def read_plates(self, image_ref: str) -> List[str]:
+        """Every plate in the image (['UNKNOWN'] when there is none)"""
+        raise NotImplementedError
+
+    async def read_plate_batch(self, image_refs: List[str]) -> List[str]:
+        """read_plate for several images, in order; engines may do it in one call"""
+        return list(await asyncio.gather(*(self.read_plate(image_ref) for image_ref in image_refs)))
+
+    async def read_plate_scored(self, image_ref: str) -> Tuple[str, float]:
+        """read_plate with a confidence in [0, 1]; engines without one report 1.0"""
+        return await self.read_plate(image_ref), 1.0
+
+    async def read_plates_scored(self, image_ref: str) -> List[Tuple[str, float]]:
+        """read_plates with a confidence in [0, 1] per plate"""
+        return [(plate, 1.0) for plate in await self.read_plates(image_ref)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+class OpenAIBackend(OCRBackend):
+    """Vision model through the OpenAI Responses API"""
+
+    name = "openai"
+
+    # Hedged duplicates may be at most this share of upstream calls, so a
+    # slow upstream is not hit with twice the load
+    HEDGE_MAX_RATIO = 0.1
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o-mini",
+        timeout: float = 30.0,
+        connect_timeout: float = 2.0,
+        max_retries: int = 1,
+        pool_size: int = 100,
+        keepalive: float = 60.0,
+        hedge: bool = False,
+        hedge_percentile: float = 95,
+        hedge_min_ms: float = 50,
+    ):
+        # Async client so a slow vision call never blocks the event loop. The
+        # keep-alive pool is sized for many OCR calls in flight and keeps idle
+        # TLS connections long enough to survive gaps between scans.
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            max_retries=max_retries,
+            http_client=httpx.AsyncClient(
+                timeout=httpx.Timeout(timeout, connect=connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                    keepalive_expiry=keepalive,
+                ),
+            ),
+        )
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_ms = hedge_min_ms
+        # Separate windows per call kind: batched calls are slower than single ones
+        self.latency: Dict[str, LatencyWindow] = {}
+        self.upstream_latency: Dict[str, LatencyHistogram] = {}
+        self.input_tokens = 0
+        self.output_tokens = 0
+        # Length of the image references (data URLs) sent upstream
+        self.image_bytes_sent = 0
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+
+    def hedge_delay(self, kind: str, budget: Optional[float]) -> Optional[float]:
+        """Seconds to wait before firing a duplicate call, or None for no hedge"""
+        if self.hedges >= self.HEDGE_MAX_RATIO * self.calls:
+            return None
+        window = self.latency.get(kind)
+        ms = window.percentile(self.hedge_percentile) if window else None
+        if ms is None:
+            return None
+        delay = max(ms, self.hedge_min_ms) / 1000
+        if budget is not None and delay >= budget:
+            return None
+        return delay
+
+    async def _call(self, kind: str, request: Dict[str, Any]):
+        self.image_bytes_sent += sum(
+            len(part.get("image_url", ""))
+            for message in request["input"]
+            for part in message["content"]
+            if part["type"] == "input_image"
+        )
+        start = time.perf_counter()
+        resp = await self.client.responses.create(**request)
+        ms = (time.perf_counter() - start) * 1000
+        self.latency.setdefault(kind, LatencyWindow()).observe(ms)
+        self.upstream_latency.setdefault(kind, LatencyHistogram()).observe(ms)
+        usage = getattr(resp, "usage", None)
+        if usage is not None:
+            self.input_tokens += getattr(usage, "input_tokens", 0) or 0
+            self.output_tokens += getattr(usage, "output_tokens", 0) or 0
+        return resp
+
+    async def _hedged(self, kind: str, request: Dict[str, Any], budget: Optional[float]):
+        """First answer of the call and, if it is slower than the hedge delay, a duplicate"""
+        delay = self.hedge_delay(kind, budget)
+        if delay is None:
+            return await self._call(kind, request)
+        tasks = [asyncio.ensure_future(self._call(kind, request))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return tasks[0].result()
+            self.hedges += 1
+            tasks.append(asyncio.ensure_future(self._call(kind, request)))
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is tasks[1]:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _create(self, kind: str, **request):
+        """responses.create bounded by the request deadline, hedged when enabled"""
+        budget = deadline.remaining()
+        if budget is not None and budget <= 0:
+            self.deadline_exceeded += 1
+            raise deadline.DeadlineExceeded("OCR deadline exceeded")
+        self.calls += 1
+        call = self._hedged(kind, request, budget) if self.hedge else self._call(kind, request)
+        if budget is None:
+            return await call
+        try:
+            return await asyncio.wait_for(call, budget)
+        except asyncio.TimeoutError:
+            self.deadline_exceeded += 1
+            raise deadline.DeadlineExceeded("OCR deadline exceeded") from None
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "backend": self.name,
+            "timeout_s": self.timeout,
+            "max_retries": self.max_retries,
+            "pool_size": self.pool_size,
+            "calls": self.calls,
+            "deadline_exceeded": self.deadline_exceeded,
+            "hedging": self.hedge,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "image_bytes_sent": self.image_bytes_sent,
+            "latency": {kind: histogram.stats() for kind, histogram in self.upstream_latency.items()},
+        }
+        for kind, window in self.latency.items():
+            stats[f"{kind}_p{self.hedge_percentile:g}_ms"] = window.percentile(self.hedge_percentile)
+        return stats
+
+    async def read_plate(self, image_ref: str) -> str:
+        """
+        Call OpenAI with a single instruction + one image.
+        image_ref: either http(s) URL or a data: URL (base64).
+        """
+        # Prompt keeps it deterministic and asks for only the plate text.
+        prompt = (
+            "Extract ONLY the license plate text (letters/numbers/spaces). "
+            "No extra words, no state names. If nothing is legible, reply with 'UNKNOWN'."
+            "If there is a dash in the plate, ommit the dash. "
+            "If this is not a license plate, reply with 'UNKNOWN'."
+        )
+
+        # Responses API with a vision model
+        # (Images may be passed via URL or Base64 data URL.)
+        resp = await self._create(
+            "plate",
+            model=self.model,
+            input=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "input_text", "text": prompt},
+                        {"type": "input_image", "image_url": image_ref, "detail": "low"},
+                    ],
+                }
+            ],
+            temperature=0,
+            max_output_tokens=32,
+        )
+
+        return clean_plate_text(response_text(resp))
+
+    async def read_plates(self, image_ref: str) -> List[str]:
+        """
+        Call OpenAI with a single instruction + one image.
+        image_ref: either http(s) URL or a data: URL (base64).
+        """
+        prompt = (
+            "You are receiving an image that may contain multiple license plates. "
+            "Extract ONLY the license plate texts (letters/numbers/spaces). "
+            "No extra words, no state names. If nothing is legible, reply with 'UNKNOWN'."
+            "If there is a dash in the plate, ommit the dash. "
+            "If this is not a license plate, reply with 'UNKNOWN'."
+            "Return the results as an array of strings, e.g. [\"ABC123\", \"XYZ789\"]"
+        )
+
+        resp = await self._create(
+            "plates",
+            model=self.model,
+            input=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "input_text", "text": prompt},
+                        {"type": "input_image", "image_url": image_ref, "detail": "low"},
+                    ],
+                }
+            ],
+            temperature=0,
+            max_output_tokens=PLATE_LIST_MAX_TOKENS,
+        )
+
+        return parse_plate_list(response_text(resp))
+
+    async def read_plate_batch(self, image_refs: List[str]) -> List[str]:
+        """
+        Call OpenAI once for several single-plate images.
+        Returns one cleaned plate (or 'UNKNOWN') per image, in order.
+        """
+        if len(image_refs) == 1:
+            return [await self.read_plate(image_refs[0])]
+
+        prompt = (
+            f"You are receiving {len(image_refs)} images, each of which may show a license plate. "
+            "For each image, in order, extract ONLY the license plate text (letters/numbers/spaces). "
+            "No extra words, no state names. If there is a dash in the plate, ommit the dash. "
+            "Use 'UNKNOWN' for an image where nothing is legible or that is not a license plate. "
+            f"Return a JSON array with exactly {len(image_refs)} strings, one per image, e.g. [\"ABC123\", \"UNKNOWN\"]"
+        )
+        content = [{"type": "input_text", "text": prompt}]
+        for image_ref in image_refs:
+            content.append({"type": "input_image", "image_url": image_ref, "detail": "low"})
+
+        resp = await self._create(
+            "batch",
+            model=self.model,
+            input=[{"role": "user", "content": content}],
+            temperature=0,
+            max_output_tokens=16 * len(image_refs) + 16,
+        )
+
+        try:
+            result = json.loads(response_text(resp).strip())
+        except json.JSONDecodeError:
+            result = None
+        if not isinstance(result, list) or len(result) != len(image_refs):
+            # The model lost track of which answer belongs to which image; ask individually
+            return await super().read_plate_batch(image_refs)
+        return [clean_plate_text(str(item)) for item in result]
+
+class TesseractBackend(OCRBackend):
+    """
+    Offline CPU OCR with Tesseract (needs the tesseract binary and pytesseract).
+    Candidate plate regions from the local detector are each read as a single
+    text line restricted to plate characters. An image that already looks
+    like a plate crop is read whole first and skips the detector when that
+    read is confident; a frame with no candidate region is read whole.
+    """
+
+    name = "tesseract"
+    CHARACTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    # Tesseract reads best with capital letters around 30-40 px tall
+    LINE_HEIGHT = 64
+    # Images at least this wide for their height, or with no side longer
+    # than CROP_MAX_SIDE, are read whole before the detector is tried
+    # (detector crops are normalized to OCR_MAX_IMAGE_DIM, 512 px by default)
+    CROP_MIN_ASPECT = 2.0
+    CROP_MAX_SIDE = 800
+
+    def __init__(self, max_regions: int = 3, min_confidence: float = 0.3, tesseract_cmd: Optional[str] = None):
+        # Optional dependency: only needed when this backend is selected
+        import pytesseract
+        self.pytesseract = pytesseract
+        if tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        self.max_regions = max_regions
+        self.min_confidence = min_confidence
+        self.config = f"--psm 7 --oem 1 -c tessedit_char_whitelist={self.CHARACTERS}"
+
+    def _load(self, image_ref: str) -> Image.Image:
+        data = image_bytes_from_ref(image_ref)
+        if data is None:
+            raise ValueError("The tesseract backend only reads inline (base64 or uploaded) images")
+        return decode_image(data, DETECT_DECODE_DIM)
+
+    def read_line(self, img: Image.Image) -> Tuple[str, float]:
+        """Text and mean word confidence (0-1) of a single-line image"""
+        gray = ImageOps.autocontrast(img.convert("L"))
+        if gray.height != self.LINE_HEIGHT:
+            width = max(1, round(gray.width * self.LINE_HEIGHT / gray.height))
+            gray = gray.resize((width, self.LINE_HEIGHT), Image.Resampling.BICUBIC)
+        data = self.pytesseract.image_to_data(gray, config=self.config, output_type=self.pytesseract.Output.DICT)
+        words = [(text, float(conf)) for text, conf in zip(data["text"], data["conf"]) if text.strip() and float(conf) >= 0]
+        if not words:
+            return "", 0.0
+        return "".join(text for text, _ in words), sum(conf for _, conf in words) / len(words) / 100
+
+    def looks_like_crop(self, img: Image.Image) -> bool:
+        """Plate-shaped or thumbnail-sized input, e.g. a crop scan or a detector crop"""
+        return img.width >= img.height * self.CROP_MIN_ASPECT or max(img.size) <= self.CROP_MAX_SIDE
+
+    def read_box(self, img: Image.Image) -> Optional[Tuple[str, float]]:
+        """(text, confidence) of one region, None when it is not a confident read"""
+        text, confidence = self.read_line(img)
+        text = clean_plate_text(text)
+        if text != "UNKNOWN" and confidence >= self.min_confidence:
+            return text, confidence
+        return None
+
+    def read_regions(self, img: Image.Image) -> List[Tuple[str, float]]:
+        """(text, confidence) for each candidate plate region, best region first"""
+        whole = (0, 0, img.width, img.height)
+        if self.looks_like_crop(img):
+            # A crop is read as it is; the detector only runs when that read fails
+            read = self.read_box(img)
+            if read is not None and PLATE_FORMAT_RE.match(read[0].replace(" ", "")):
+                return [read]
+            boxes = [box for box in find_plate_regions(img, self.max_regions) if box != whole]
+        else:
+            boxes = find_plate_regions(img, self.max_regions) or [whole]
+        reads = []
+        for box in boxes:
+            read = self.read_box(img.crop(box))
+            if read is not None:
+                reads.append(read)
+        return reads
+
+    def _read_plate(self, image_ref: str) -> Tuple[str, float]:
+        reads = self.read_regions(self._load(image_ref))
+        return max(reads, key=lambda read: read[1]) if reads else ("UNKNOWN", 0.0)
+
+    def _read_plates(self, image_ref: str) -> List[Tuple[str, float]]:
+        best: Dict[str, float] = {}
+        for text, confidence in self.read_regions(self._load(image_ref)):
+            best[text] = max(confidence, best.get(text, 0.0))
+        return list(best.items()) or [("UNKNOWN", 0.0)]
+
+    async def read_plate(self, image_ref: str) -> str:
+        return (await self.read_plate_scored(image_ref))[0]
+
+    async def read_plates(self, image_ref: str) -> List[str]:
+        return [text for text, _ in await self.read_plates_scored(image_ref)]
+
+    async def read_plate_scored(self, image_ref: str) -> Tuple[str, float]:
+        return await asyncio.to_thread(self._read_plate, image_ref)
+
+    async def read_plates_scored(self, image_ref: str) -> List[Tuple[str, float]]:
+        return await asyncio.to_thread(self._read_plates, image_ref)
+
+class TierStats:
+    """Call counts and latency distribution of one cascade tier"""
+
+    def __init__(self):
+        self.calls = 0
+        self.accepted = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "accepted": self.accepted,
+            "errors": self.errors,
+            "hit_rate": self.accepted / self.calls if self.calls else 0.0,
+            "latency": self.latency.stats(),
+        }
+
+class CascadeBackend(OCRBackend):
+    """
+    Confidence-tiered OCR. The local engine answers first; its read is
+    returned when it looks like a plate and is confident enough, or only
+    moderately confident but an exact match for a known plate. Everything
+    else escalates to the remote engine.
+    """
+
+    name = "cascade"
+
+    def __init__(
+        self,
+        local: OCRBackend,
+        remote: OCRBackend,
+        min_confidence: float = 0.85,
+        known_confidence: float = 0.6,
+        is_known: Optional[Callable[[str], bool]] = None,
+    ):
+        self.local = local
+        self.remote = remote
+        self.min_confidence = min_confidence
+        self.known_confidence = known_confidence
+        self.is_known = is_known
+        self.tiers = {"local": TierStats(), "remote": TierStats()}
+
+    def accept(self, text: str, confidence: float) -> bool:
+        plate = text.replace(" ", "")
+        if text == "UNKNOWN" or not PLATE_FORMAT_RE.match(plate):
+            return False
+        if confidence >= self.min_confidence:
+            return True
+        return confidence >= self.known_confidence and self.is_known is not None and self.is_known(plate)
+
+    async def _tier(self, tier: str, call, images: int = 1):
+        """
+        Await one tier's call, recording its latency; None if the tier failed.
+        Counts are per image, so a batch call counts once for each image in it.
+        """
+        stats = self.tiers[tier]
+        stats.calls += images
+        start = time.perf_counter()
+        try:
+            return await call
+        except Exception:
+            stats.errors += images
+            if tier == "remote":
+                raise
+            return None
+        finally:
+            stats.latency.observe((time.perf_counter() - start) * 1000)
+
+    async def read_plate_scored(self, image_ref: str) -> Tuple[str, float]:
+        read = await self._tier("local", self.local.read_plate_scored(image_ref))
+        if read is not None and self.accept(*read):
+            self.tiers["local"].accepted += 1
+            return read
+        read = await self._tier("remote", self.remote.read_plate_scored(image_ref))
+        self.tiers["remote"].accepted += 1
+        return read
+
+    async def read_plates_scored(self, image_ref: str) -> List[Tuple[str, float]]:
+        reads = await self._tier("local", self.local.read_plates_scored(image_ref))
+        # A frame is only answered locally when every plate in it passes
+        if reads and all(self.accept(*read) for read in reads):
+            self.tiers["local"].accepted += 1
+            return reads
+        reads = await self._tier("remote", self.remote.read_plates_scored(image_ref))
+        self.tiers["remote"].accepted += 1
+        return reads
+
+    async def read_plate(self, image_ref: str) -> str:
+        return (await self.read_plate_scored(image_ref))[0]
+
+    async def read_plates(self, image_ref: str) -> List[str]:
+        return [text for text, _ in await self.read_plates_scored(image_ref)]
+
+    async def read_plate_batch(self, image_refs: List[str]) -> List[str]:
+        reads = await asyncio.gather(*(self._tier("local", self.local.read_plate_scored(ref)) for ref in image_refs))
+        results: List[Optional[str]] = []
+        for read in reads:
+            if read is not None and self.accept(*read):
+                self.tiers["local"].accepted += 1
+                results.append(read[0])
+            else:
+                results.append(None)
+        escalate = [index for index, result in enumerate(results) if result is None]
+        if escalate:
+            # The low-confidence frames still go upstream together
+            remote = await self._tier(
+                "remote", self.remote.read_plate_batch([image_refs[index] for index in escalate]), len(escalate)
+            )
+            self.tiers["remote"].accepted += len(escalate)
+            for index, plate in zip(escalate, remote):
+                results[index] = plate
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "min_confidence": self.min_confidence,
+            "known_confidence": self.known_confidence,
+            "tiers": {tier: stats.stats() for tier, stats in self.tiers.items()},
+            "remote": self.remote.stats(),
+        }
+
+def open_ocr_backend(
+    kind: str,
+    api_key: Optional[str] = None,
+    model: str = "gpt-4o-mini",
+    upstream: Optional[Dict[str, Any]] = None,
+    local: Optional[Dict[str, Any]] = None,
+    **cascade,
+) -> OCRBackend:
+    """
+    Build the OCR engine selected by configuration ("openai", "tesseract" or
+    "cascade"). `upstream` holds OpenAIBackend client options (timeouts, pool,
+    hedging), `local` holds TesseractBackend options (region limit, confidence
+    floor, binary path); cascade options are passed through to CascadeBackend.
+    """
+    if kind == "openai":
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY environment variable is required")
+        return OpenAIBackend(api_key, model, **(upstream or {}))
+    if kind == "tesseract":
+        return TesseractBackend(**(local or {}))
+    if kind == "cascade":
+        return CascadeBackend(
+            TesseractBackend(**(local or {})), open_ocr_backend("openai", api_key, model, upstream), **cascade
+        )
+    raise ValueError(f"Unknown OCR_BACKEND: {kind}")
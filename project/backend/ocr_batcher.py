@@ -0,0 +1,75 @@
+"""
+Micro-batching scheduler for single-image OCR requests.
+
+Requests that arrive within a short window (or until the batch is full) are
+sent upstream as one multi-image call, and the per-image answers are fanned
+back out to the waiting handlers.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+class OCRBatcher:
+    """Coalesces concurrent submit() calls into send_batch(image_refs) calls"""
+
+    def __init__(self, send_batch: Callable[[List[str]], Awaitable[List[str]]], window_ms: float = 20, max_batch: int = 8):
+        self.send_batch = send_batch
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.pending: List[Tuple[str, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.tasks: set = set()
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, image_ref: str) -> str:
+        """Queue one image and wait for its slot in the batched answer"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((image_ref, future))
+        self.requests += 1
+
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+        if self.pending:
+            self.timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        if not batch:
+            return
+
+        self.batches += 1
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            results = await self.send_batch([image_ref for image_ref, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+        }
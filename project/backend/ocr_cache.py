@@ -0,0 +1,63 @@
+"""
+Content-addressed cache for OCR results.
+
+Entries are keyed on a digest of the normalized image rather than on the
+base64 text, so the same picture sent again (re-wrapped, with or without a
+data: prefix, or in another container format that decodes to the same
+pixels) hits the cache. Matching is exact on purpose: two plates a single
+character apart differ by only a bit or two of a perceptual hash, and
+serving one car's record for another is a wrong answer, not a stale one.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+def image_key(data: bytes) -> bytes:
+    """Exact cache key of normalized image bytes"""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+class OCRCache:
+    """LRU + TTL cache of OCR results keyed on exact image digests"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 10.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _expire(self, now: float) -> None:
+        expired = [key for key, (stored_at, _) in self.entries.items() if now - stored_at > self.ttl_seconds]
+        for key in expired:
+            del self.entries[key]
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached result for exactly this image"""
+        self._expire(time.monotonic())
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a result, evicting the least recently used entry when full"""
+        self.entries[key] = (time.monotonic(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -0,0 +1,194 @@
+"""
+Cheap CPU detector for likely license plate regions.
+
+Plate characters produce a dense row of strong vertical edges. At each level
+of a small image pyramid the detector thresholds the horizontal gradient,
+closes the gaps between characters with a horizontal kernel, labels the
+connected blobs and keeps the ones shaped like a plate: wide, short, solidly
+filled and crossed by several character strokes per row. Running the same
+fixed-size kernel over the pyramid makes it work for distant plates in a
+road scene as well as for close-up crop scans.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+from PIL import Image
+
+Box = Tuple[int, int, int, int]  # left, top, right, bottom
+
+PYRAMID_WIDTHS = (1280, 640, 320, 160, 80, 48)
+MIN_EDGE_CONTRAST = 32
+MAX_EDGE_CONTRAST = 80
+CLOSE_KERNEL = 5
+MIN_BLOB_WIDTH = 16
+MIN_BLOB_HEIGHT = 5
+MIN_ASPECT = 1.4
+MIN_CLOSEUP_ASPECT = 0.8
+MAX_ASPECT = 8.0
+MIN_FILL = 0.4
+MIN_STROKES = 4
+PAD_X = 0.08
+PAD_Y = 0.25
+
+def _vertical_edges(gray: np.ndarray) -> np.ndarray:
+    """Binary map of strong horizontal-gradient pixels"""
+    gray = gray.astype(np.int16)
+    gx = np.zeros_like(gray)
+    gx[:, 1:-1] = np.abs(gray[:, 2:] - gray[:, :-2])
+    # Adapt to noisy frames, but never above what printed characters clear easily
+    threshold = min(MAX_EDGE_CONTRAST, max(MIN_EDGE_CONTRAST, float(gx.mean() + 2 * gx.std())))
+    return gx > threshold
+
+def _close_rows(mask: np.ndarray, k: int) -> np.ndarray:
+    """Horizontal morphological closing (dilate then erode) with a 1 x k kernel"""
+    def box_any(m: np.ndarray, all_set: bool) -> np.ndarray:
+        padded = np.pad(m.astype(np.int32), ((0, 0), (k // 2 + 1, k // 2)), constant_values=int(all_set))
+        sums = np.cumsum(padded, axis=1)
+        window = sums[:, k:] - sums[:, :-k]
+        return window == k if all_set else window > 0
+    return box_any(box_any(mask, False), True)
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Row, start and end of every horizontal run of set pixels, in row-major order"""
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    diff = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(diff == 1)
+    _, ends = np.nonzero(diff == -1)
+    return rows, starts, ends
+
+def _blobs(mask: np.ndarray) -> List[Tuple[Box, int]]:
+    """Bounding boxes and pixel counts of 8-connected blobs (run-based union-find)"""
+    rows, starts, ends = (a.tolist() for a in _runs(mask))
+    parent = list(range(len(rows)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    previous: List[int] = []
+    current: List[int] = []
+    row = -1
+    for index, y in enumerate(rows):
+        if y != row:
+            previous = current if y == row + 1 else []
+            current = []
+            row = y
+        start, end = starts[index], ends[index]
+        for other in previous:
+            if starts[other] <= end and start <= ends[other]:
+                parent[find(index)] = find(other)
+        current.append(index)
+
+    boxes = {}
+    for index, y in enumerate(rows):
+        root = find(index)
+        start, end = starts[index], ends[index]
+        left, top, right, bottom, area = boxes.get(root, (start, y, end, y + 1, 0))
+        boxes[root] = (min(left, start), top, max(right, end), y + 1, area + end - start)
+    return [((left, top, right, bottom), area) for left, top, right, bottom, area in boxes.values()]
+
+def _stroke_count(edges: np.ndarray, box: Box) -> float:
+    """Median number of edge runs per row across the middle of a box"""
+    left, top, right, bottom = box
+    h = bottom - top
+    band = edges[top + h // 4: bottom - h // 4 or bottom, left:right]
+    if band.size == 0:
+        return 0.0
+    rows = _runs(band)[0]
+    return float(np.median(np.bincount(rows, minlength=band.shape[0])))
+
+def _join_rows(boxes: List[Box]) -> List[Box]:
+    """Join blobs that sit side by side on the same text line (e.g. "ABC" and "1234")"""
+    boxes = sorted(boxes)
+    joined = True
+    while joined:
+        joined = False
+        for i, a in enumerate(boxes):
+            for j in range(i + 1, len(boxes)):
+                b = boxes[j]
+                ha, hb = a[3] - a[1], b[3] - b[1]
+                shared = min(a[3], b[3]) - max(a[1], b[1])
+                gap = max(a[0], b[0]) - min(a[2], b[2])
+                if shared >= 0.6 * min(ha, hb) and max(ha, hb) <= 1.6 * min(ha, hb) and gap <= max(ha, hb):
+                    boxes[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    del boxes[j]
+                    joined = True
+                    break
+            if joined:
+                break
+    return boxes
+
+def _detect_level(gray: np.ndarray) -> List[Tuple[float, Box]]:
+    edges = _vertical_edges(gray)
+    texty = []
+    for box, area in _blobs(_close_rows(edges, CLOSE_KERNEL)):
+        left, top, right, bottom = box
+        w, h = right - left, bottom - top
+        if h < MIN_BLOB_HEIGHT or area < MIN_FILL * w * h:
+            continue
+        if _stroke_count(edges, box) >= 2:
+            texty.append(box)
+
+    found = []
+    for box in _join_rows(texty):
+        left, top, right, bottom = box
+        w, h = right - left, bottom - top
+        # A crop scan framed tightly around the characters can be almost square
+        min_aspect = MIN_CLOSEUP_ASPECT if w >= 0.6 * gray.shape[1] else MIN_ASPECT
+        if w < MIN_BLOB_WIDTH or not min_aspect <= w / h <= MAX_ASPECT:
+            continue
+        strokes = _stroke_count(edges, box)
+        if strokes >= MIN_STROKES:
+            found.append((strokes, box))
+    return found
+
+def _overlap(box: Box, other: Box) -> float:
+    """Fraction of box's area that lies inside other"""
+    ix = min(box[2], other[2]) - max(box[0], other[0])
+    iy = min(box[3], other[3]) - max(box[1], other[1])
+    if ix <= 0 or iy <= 0:
+        return 0.0
+    return ix * iy / float((box[2] - box[0]) * (box[3] - box[1]))
+
+def find_plate_regions(img: Image.Image, max_regions: int = 3) -> List[Box]:
+    """Return padded candidate plate boxes in img coordinates, best first"""
+    level = img.convert("L")
+    candidates: List[Tuple[float, Box]] = []
+    for width in PYRAMID_WIDTHS:
+        if width >= level.width and level.width < img.width:
+            continue
+        if width < level.width:
+            # Each level is resampled from the previous one, which is much cheaper
+            level = level.resize((width, max(1, round(level.height * width / level.width))), Image.Resampling.BOX)
+        scale = level.width / img.width
+        for strokes, (left, top, right, bottom) in _detect_level(np.asarray(level)):
+            # Prefer many character strokes on tall text: that is the plate number
+            score = strokes * ((bottom - top) / scale) ** 0.5
+            candidates.append((score, (
+                int(left / scale), int(top / scale), int(right / scale), int(bottom / scale)
+            )))
+
+    candidates.sort(key=lambda c: c[0], reverse=True)
+    boxes: List[Box] = []
+    for _, box in candidates:
+        # The same plate shows up on neighbouring pyramid levels
+        if any(_overlap(box, kept) > 0.5 or _overlap(kept, box) > 0.5 for kept in boxes):
+            continue
+        boxes.append(box)
+        if len(boxes) >= max_regions:
+            break
+
+    padded = []
+    for left, top, right, bottom in boxes:
+        pad_x, pad_y = (right - left) * PAD_X, (bottom - top) * PAD_Y
+        padded.append((
+            max(0, int(left - pad_x)),
+            max(0, int(top - pad_y)),
+            min(img.width, int(right + pad_x)),
+            min(img.height, int(bottom + pad_y)),
+        ))
+    return padded
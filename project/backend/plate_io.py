@@ -0,0 +1,188 @@
+"""
+Streaming bulk import/export of plate records as NDJSON or CSV.
+
+Uploads are parsed line by line straight off the request stream, validated
+in chunks and written in batched transactions, so a multi-million-row
+hotlist never has to fit in memory. Exports page through the store and
+yield encoded chunks as they go.
+"""
+
+import asyncio
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from models import LicensePlate
+from plate_store import PlateStore
+
+CSV_COLUMNS = ["plate_number", "owner_name", "dob", "has_warrant", "warrant_reason", "registration_date", "is_stolen"]
+MAX_REPORTED_ERRORS = 100
+# A quoted field longer than this is taken to be a stray quote, not a record
+MAX_CSV_ROW_CHARS = 64 * 1024
+# No record comes close to this; a longer line would have to be buffered whole
+MAX_LINE_BYTES = 64 * 1024
+
+class LineTooLong(ValueError):
+    """An upload line longer than the limit; the rest of the upload is not read"""
+
+    def __init__(self, line_number: int, limit: int):
+        super().__init__(f"line {line_number} is longer than {limit} bytes")
+        self.line_number = line_number
+        self.accepted = 0
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line: int = MAX_LINE_BYTES) -> AsyncIterator[str]:
+    """
+    Split a byte stream into decoded lines without buffering the whole body;
+    each line keeps its line ending. Raises LineTooLong instead of buffering
+    a line longer than max_line bytes.
+    """
+    pending = b""
+    line_number = 0
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if len(line) > max_line:
+                raise LineTooLong(line_number, max_line)
+            yield line.decode("utf-8-sig") + "\n"
+        if len(pending) > max_line:
+            raise LineTooLong(line_number + 1, max_line)
+    if pending:
+        yield pending.decode("utf-8-sig")
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (line_number, raw record) pairs; raw record is a dict or an Exception"""
+    header: Optional[List[str]] = None
+    line_number = 0
+    # A quoted CSV field may span lines; rows are joined until the quotes balance
+    row = ""
+    row_start = 0
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if fmt == "csv" and row:
+            row += line
+            if row.count('"') % 2:
+                if len(row) > MAX_CSV_ROW_CHARS:
+                    yield row_start, ValueError("unterminated quoted CSV field")
+                    row = ""
+                continue
+            line, row = row, ""
+        elif fmt == "csv" and line.count('"') % 2:
+            row, row_start = line, line_number
+            continue
+        else:
+            row_start = line_number
+        if not line.strip():
+            continue
+        if fmt == "csv":
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            record = dict(zip(header, values))
+            # Empty CSV cells mean "no value" for the optional column
+            if record.get("warrant_reason") == "":
+                record["warrant_reason"] = None
+            yield row_start, record
+        else:
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, e
+    if row:
+        yield row_start, ValueError("unterminated quoted CSV field")
+
+def format_validation_error(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+def write_chunk(store: PlateStore, records: List[Tuple[int, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+    """Validate a chunk of raw records and write the valid ones in one transaction"""
+    plates: List[LicensePlate] = []
+    errors: List[Dict[str, Any]] = []
+    for line_number, record in records:
+        try:
+            if isinstance(record, json.JSONDecodeError):
+                raise ValueError(f"invalid JSON: {record}")
+            if isinstance(record, Exception):
+                raise record
+            if not isinstance(record, dict):
+                raise ValueError("expected an object")
+            plate = LicensePlate.model_validate(record)
+            store.check_plate(plate)
+            plates.append(plate)
+        except ValidationError as e:
+            errors.append({"line": line_number, "error": format_validation_error(e)})
+        except ValueError as e:
+            errors.append({"line": line_number, "error": str(e)})
+    return store.add_many(plates), errors
+
+async def import_plates(store: PlateStore, chunks: AsyncIterator[bytes], fmt: str, batch_size: int = 5000) -> Dict[str, Any]:
+    """Stream an NDJSON/CSV upload into the store in batches; report rejected rows"""
+    accepted = 0
+    rejected = 0
+    errors: List[Dict[str, Any]] = []
+    records: List[Tuple[int, Any]] = []
+
+    async def flush():
+        nonlocal accepted, rejected
+        # Validation and the write both run off the event loop
+        written, chunk_errors = await asyncio.to_thread(write_chunk, store, records)
+        accepted += written
+        rejected += len(chunk_errors)
+        errors.extend(chunk_errors[:MAX_REPORTED_ERRORS - len(errors)])
+
+    try:
+        async for record in iter_records(chunks, fmt):
+            records.append(record)
+            if len(records) >= batch_size:
+                await flush()
+                records = []
+    except LineTooLong as e:
+        # Rows before the long line are kept, as earlier batches already are
+        if records:
+            await flush()
+        e.accepted = accepted
+        raise
+    if records:
+        await flush()
+
+    return {"accepted": accepted, "rejected": rejected, "errors": errors}
+
+def export_ndjson(store: PlateStore, batch_size: int = 1000) -> Iterator[bytes]:
+    """Yield the store as NDJSON, one encoded batch at a time"""
+    lines = []
+    for plate in store.iter_plates(batch_size):
+        lines.append(plate.model_dump_json())
+        if len(lines) >= batch_size:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+def export_csv(store: PlateStore, batch_size: int = 1000) -> Iterator[bytes]:
+    """Yield the store as CSV with a header row, one encoded batch at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    rows = 0
+    for plate in store.iter_plates(batch_size):
+        writer.writerow([
+            plate.plate_number,
+            plate.owner_name,
+            plate.dob.isoformat(),
+            str(plate.has_warrant).lower(),
+            plate.warrant_reason or "",
+            plate.registration_date.isoformat(),
+            str(plate.is_stolen).lower(),
+        ])
+        rows += 1
+        if rows % batch_size == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
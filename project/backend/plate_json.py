@@ -0,0 +1,95 @@
+"""
+Pre-encoded JSON for plate records returned by the /extract* endpoints.
+
+Each record is encoded once with orjson as an open JSON object fragment
+(`{"plate":...,"is_stolen":false` without the closing brace) and kept in an
+LRU cache keyed on plate number. Responses are spliced together from cached
+fragments plus a small match suffix, so a hot plate costs no encoding at
+all. The cache listens to the plate store and drops entries on every write.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import orjson
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value)
+
+def encode_record(plate) -> bytes:
+    """Open JSON object fragment for a plate record (no closing brace)"""
+    return orjson.dumps({
+        "plate": plate.plate_number,
+        "owner_name": plate.owner_name,
+        "dob": plate.dob,
+        "has_warrant": plate.has_warrant,
+        "warrant_reason": plate.warrant_reason,
+        "registration_date": plate.registration_date,
+        "is_stolen": plate.is_stolen,
+    })[:-1]
+
+def encode_suffix(fields: Dict[str, Any]) -> bytes:
+    """Extra fields that close a record fragment: `,"a":1,"b":2}`"""
+    return b"," + orjson.dumps(fields)[1:] if fields else b"}"
+
+class PlateJSONCache:
+    """LRU cache of encoded record fragments, invalidated by plate-store writes"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.lock = threading.Lock()
+        # Bumped on every write so a fragment encoded from a record read
+        # before the write is never cached
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, plate_number: str, load: Callable[[str], Any]) -> Optional[bytes]:
+        """Cached fragment for plate_number, loading and encoding it on a miss"""
+        key = plate_number.upper()
+        with self.lock:
+            fragment = self.entries.get(key)
+            if fragment is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+            version = self.version
+
+        plate = load(plate_number)
+        if plate is None:
+            return None
+        fragment = encode_record(plate)
+        if self.max_entries > 0:
+            with self.lock:
+                if self.version == version:
+                    self.entries[key] = fragment
+                    if len(self.entries) > self.max_entries:
+                        self.entries.popitem(last=False)
+        return fragment
+
+    def plates_added(self, plates) -> None:
+        self.plates_removed(plate.plate_number for plate in plates)
+
+    def plates_removed(self, plate_numbers) -> None:
+        with self.lock:
+            self.version += 1
+            for number in plate_numbers:
+                self.entries.pop(number.upper(), None)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.version += 1
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self.entries),
+            "max_entries": self.max_entries,
+        }
@@ -0,0 +1,540 @@
+"""
+Storage backends for license plate records.
+
+`PlateStore` is the interface main.py talks to. `MemoryPlateStore` keeps the
+original dict behaviour; `CompactPlateStore` holds the same data in columnar
+arrays so tens of millions of plates fit in one worker's memory;
+`SQLitePlateStore` is durable and indexed so state hotlists with millions of
+plates can be loaded and queried.
+"""
+
+import os
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from models import LicensePlate
+
+class PlateStore:
+    """
+    Interface for plate record storage; plate numbers are matched upper-case.
+    Backends implement _write and _delete; listeners registered with
+    add_listener (objects with plates_added / plates_removed) are told about
+    every change so derived indexes stay in sync.
+    """
+
+    # True when the backing storage did not exist before this process opened it
+    is_new = True
+
+    def __init__(self):
+        self.listeners: list = []
+
+    def add_listener(self, listener) -> None:
+        self.listeners.append(listener)
+
+    def lookup(self, plate_number: str) -> Optional[LicensePlate]:
+        raise NotImplementedError
+
+    def add(self, plate: LicensePlate) -> bool:
+        return self.add_many([plate]) == 1
+
+    def remove(self, plate_number: str) -> bool:
+        removed = self._delete(plate_number.upper())
+        if removed:
+            for listener in self.listeners:
+                listener.plates_removed([plate_number])
+        return removed
+
+    def add_many(self, plates: Iterable[LicensePlate]) -> int:
+        """Insert or replace a batch of plates; returns how many were written"""
+        plates = list(plates)
+        written = self._write(plates)
+        for listener in self.listeners:
+            listener.plates_added(plates)
+        return written
+
+    def check_plate(self, plate: LicensePlate) -> None:
+        """Raise ValueError if this backend cannot store the plate"""
+
+    def _write(self, plates: List[LicensePlate]) -> int:
+        raise NotImplementedError
+
+    def _delete(self, plate_key: str) -> bool:
+        raise NotImplementedError
+
+    def all_plates(self) -> List[LicensePlate]:
+        raise NotImplementedError
+
+    def page_plates(
+        self,
+        after: str = "",
+        limit: int = 100,
+        has_warrant: Optional[bool] = None,
+        is_stolen: Optional[bool] = None,
+        registered_from: Optional[date] = None,
+        registered_to: Optional[date] = None,
+    ) -> List[LicensePlate]:
+        """Up to limit matching plates with plate_number > after, in plate_number order"""
+        raise NotImplementedError
+
+    def iter_plates(self, batch_size: int = 1000, **filters) -> Iterator[LicensePlate]:
+        """Stream every matching plate in plate_number order, one page at a time"""
+        after = ""
+        while True:
+            page = self.page_plates(after, batch_size, **filters)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after = page[-1].plate_number.upper()
+
+    def iter_records(self, batch_size: int = 10000) -> Iterator:
+        """
+        Stream every record in no particular order, for building in-process
+        indexes. Records have LicensePlate's attributes but may be lightweight
+        read-only views rather than models.
+        """
+        return self.iter_plates(batch_size)
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def ping(self) -> bool:
+        """Cheap liveness check of the backing storage"""
+        return True
+
+    def catch_up(self) -> bool:
+        """
+        Tell listeners about writes made by other processes since the last
+        call. Returns True when that is not possible (too many, or no longer
+        recorded), so derived indexes must be rebuilt from the store.
+        """
+        return False
+
+class MemoryPlateStore(PlateStore):
+    """Process-local dict store (lost on restart)"""
+
+    def __init__(self):
+        super().__init__()
+        self.plates: Dict[str, LicensePlate] = {}
+
+    def lookup(self, plate_number: str) -> Optional[LicensePlate]:
+        return self.plates.get(plate_number.upper())
+
+    def _write(self, plates: List[LicensePlate]) -> int:
+        for plate in plates:
+            self.plates[plate.plate_number.upper()] = plate
+        return len(plates)
+
+    def _delete(self, plate_key: str) -> bool:
+        return self.plates.pop(plate_key, None) is not None
+
+    def all_plates(self) -> List[LicensePlate]:
+        return list(self.plates.values())
+
+    def page_plates(self, after="", limit=100, has_warrant=None, is_stolen=None, registered_from=None, registered_to=None):
+        page = []
+        for key in sorted(self.plates):
+            if key <= after:
+                continue
+            plate = self.plates[key]
+            if has_warrant is not None and plate.has_warrant != has_warrant:
+                continue
+            if is_stolen is not None and plate.is_stolen != is_stolen:
+                continue
+            if registered_from is not None and plate.registration_date < registered_from:
+                continue
+            if registered_to is not None and plate.registration_date > registered_to:
+                continue
+            page.append(plate)
+            if len(page) >= limit:
+                break
+        return page
+
+    def count(self) -> int:
+        return len(self.plates)
+
+FLAG_WARRANT = 1
+FLAG_STOLEN = 2
+
+class StringPool:
+    """Stores each distinct string once and hands out small integer ids"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def intern(self, value: str) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+class PlateView:
+    """Read-only view of one CompactPlateStore row with LicensePlate's attributes"""
+
+    __slots__ = ("store", "row", "plate_number")
+
+    def __init__(self, store: "CompactPlateStore", row: int):
+        self.store = store
+        self.row = row
+        self.plate_number = store.numbers[row]
+
+    @property
+    def owner_name(self) -> str:
+        return self.store.owner_pool.strings[self.store.owners[self.row]]
+
+    @property
+    def dob(self) -> date:
+        return date.fromordinal(self.store.dobs[self.row])
+
+    @property
+    def has_warrant(self) -> bool:
+        return bool(self.store.flags[self.row] & FLAG_WARRANT)
+
+    @property
+    def warrant_reason(self) -> Optional[str]:
+        reason = self.store.reasons[self.row]
+        return None if reason < 0 else self.store.reason_pool.strings[reason]
+
+    @property
+    def registration_date(self) -> date:
+        return date.fromordinal(self.store.registrations[self.row])
+
+    @property
+    def is_stolen(self) -> bool:
+        return bool(self.store.flags[self.row] & FLAG_STOLEN)
+
+    def to_model(self) -> LicensePlate:
+        return LicensePlate.model_construct(
+            plate_number=self.plate_number,
+            owner_name=self.owner_name,
+            dob=self.dob,
+            has_warrant=self.has_warrant,
+            warrant_reason=self.warrant_reason,
+            registration_date=self.registration_date,
+            is_stolen=self.is_stolen,
+        )
+
+class CompactPlateStore(PlateStore):
+    """
+    Process-local columnar store (lost on restart).
+    One row per plate across typed arrays: interned owner and warrant-reason
+    ids, dates as ordinals and the two alert flags packed into a byte. Plate
+    numbers map to rows through one dict; deleted rows are reused. Models are
+    only built for records that leave the store.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.index: Dict[str, int] = {}
+        self.numbers: List[Optional[str]] = []
+        self.owners = array("I")
+        self.reasons = array("i")
+        self.dobs = array("i")
+        self.registrations = array("i")
+        self.flags = array("B")
+        self.owner_pool = StringPool()
+        self.reason_pool = StringPool()
+        self.free_rows: List[int] = []
+        # Plate numbers in order for pagination, rebuilt lazily after writes
+        self.sorted_numbers: Optional[List[str]] = None
+
+    def lookup(self, plate_number: str) -> Optional[LicensePlate]:
+        with self.lock:
+            row = self.index.get(plate_number.upper())
+            return None if row is None else PlateView(self, row).to_model()
+
+    def _write(self, plates: List[LicensePlate]) -> int:
+        with self.lock:
+            for plate in plates:
+                number = plate.plate_number.upper()
+                owner = self.owner_pool.intern(plate.owner_name)
+                reason = -1 if plate.warrant_reason is None else self.reason_pool.intern(plate.warrant_reason)
+                flags = (FLAG_WARRANT if plate.has_warrant else 0) | (FLAG_STOLEN if plate.is_stolen else 0)
+                row = self.index.get(number)
+                if row is None and self.free_rows:
+                    row = self.free_rows.pop()
+                if row is None:
+                    self.index[number] = len(self.numbers)
+                    self.numbers.append(number)
+                    self.owners.append(owner)
+                    self.reasons.append(reason)
+                    self.dobs.append(plate.dob.toordinal())
+                    self.registrations.append(plate.registration_date.toordinal())
+                    self.flags.append(flags)
+                    self.sorted_numbers = None
+                    continue
+                if self.numbers[row] != number:
+                    self.index[number] = row
+                    self.numbers[row] = number
+                    self.sorted_numbers = None
+                self.owners[row] = owner
+                self.reasons[row] = reason
+                self.dobs[row] = plate.dob.toordinal()
+                self.registrations[row] = plate.registration_date.toordinal()
+                self.flags[row] = flags
+        return len(plates)
+
+    def _delete(self, plate_key: str) -> bool:
+        with self.lock:
+            row = self.index.pop(plate_key, None)
+            if row is None:
+                return False
+            self.numbers[row] = None
+            self.free_rows.append(row)
+            self.sorted_numbers = None
+        return True
+
+    def all_plates(self) -> List[LicensePlate]:
+        with self.lock:
+            return [PlateView(self, row).to_model() for row in self.index.values()]
+
+    def page_plates(self, after="", limit=100, has_warrant=None, is_stolen=None, registered_from=None, registered_to=None):
+        registered_from = registered_from.toordinal() if registered_from is not None else None
+        registered_to = registered_to.toordinal() if registered_to is not None else None
+        page = []
+        with self.lock:
+            if self.sorted_numbers is None:
+                self.sorted_numbers = sorted(self.index)
+            numbers = self.sorted_numbers
+            # Filters read the columns directly; only matches become models
+            for position in range(bisect_right(numbers, after), len(numbers)):
+                row = self.index[numbers[position]]
+                flags = self.flags[row]
+                if has_warrant is not None and bool(flags & FLAG_WARRANT) != has_warrant:
+                    continue
+                if is_stolen is not None and bool(flags & FLAG_STOLEN) != is_stolen:
+                    continue
+                if registered_from is not None and self.registrations[row] < registered_from:
+                    continue
+                if registered_to is not None and self.registrations[row] > registered_to:
+                    continue
+                page.append(PlateView(self, row).to_model())
+                if len(page) >= limit:
+                    break
+        return page
+
+    def iter_records(self, batch_size: int = 10000) -> Iterator[PlateView]:
+        for start in range(0, len(self.numbers), batch_size):
+            with self.lock:
+                rows = [row for row in range(start, min(start + batch_size, len(self.numbers))) if self.numbers[row] is not None]
+            for row in rows:
+                yield PlateView(self, row)
+
+    def count(self) -> int:
+        return len(self.index)
+
+PLATE_COLUMNS = "plate_number, owner_name, dob, has_warrant, warrant_reason, registration_date, is_stolen"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plates (
+    plate_number TEXT PRIMARY KEY,
+    owner_name TEXT NOT NULL,
+    dob TEXT NOT NULL,
+    has_warrant INTEGER NOT NULL,
+    warrant_reason TEXT,
+    registration_date TEXT NOT NULL,
+    is_stolen INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_plates_has_warrant ON plates (has_warrant);
+CREATE INDEX IF NOT EXISTS idx_plates_is_stolen ON plates (is_stolen);
+CREATE INDEX IF NOT EXISTS idx_plates_registration_date ON plates (registration_date);
+-- Every change to plates, so other workers can apply it to their indexes
+CREATE TABLE IF NOT EXISTS plate_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    plate_number TEXT NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS plates_inserted AFTER INSERT ON plates
+BEGIN INSERT INTO plate_changes (plate_number) VALUES (NEW.plate_number); END;
+CREATE TRIGGER IF NOT EXISTS plates_updated AFTER UPDATE ON plates
+BEGIN INSERT INTO plate_changes (plate_number) VALUES (NEW.plate_number); END;
+CREATE TRIGGER IF NOT EXISTS plates_deleted AFTER DELETE ON plates
+BEGIN INSERT INTO plate_changes (plate_number) VALUES (OLD.plate_number); END;
+"""
+
+def plate_to_row(plate: LicensePlate) -> tuple:
+    return (
+        plate.plate_number.upper(),
+        plate.owner_name,
+        plate.dob.isoformat(),
+        int(plate.has_warrant),
+        plate.warrant_reason,
+        plate.registration_date.isoformat(),
+        int(plate.is_stolen),
+    )
+
+def row_to_plate(row: tuple) -> LicensePlate:
+    # Rows were validated on the way in, so skip pydantic validation here
+    return LicensePlate.model_construct(
+        plate_number=row[0],
+        owner_name=row[1],
+        dob=date.fromisoformat(row[2]),
+        has_warrant=bool(row[3]),
+        warrant_reason=row[4],
+        registration_date=date.fromisoformat(row[5]),
+        is_stolen=bool(row[6]),
+    )
+
+class SQLitePlateStore(PlateStore):
+    """
+    Durable store in a single SQLite file.
+    WITHOUT ROWID table clustered on plate_number, secondary indexes on the
+    alert flags, WAL journaling, and constant SQL so sqlite3's statement
+    cache keeps every query prepared.
+    """
+
+    LOOKUP_SQL = f"SELECT {PLATE_COLUMNS} FROM plates WHERE plate_number = ?"
+    UPSERT_SQL = f"INSERT OR REPLACE INTO plates ({PLATE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+    DELETE_SQL = "DELETE FROM plates WHERE plate_number = ?"
+    ALL_SQL = f"SELECT {PLATE_COLUMNS} FROM plates ORDER BY plate_number"
+    COUNT_SQL = "SELECT COUNT(*) FROM plates"
+    LAST_CHANGE_SQL = "SELECT COALESCE(MAX(seq), 0) FROM plate_changes"
+    CHANGES_SQL = "SELECT seq, plate_number FROM plate_changes WHERE seq > ? ORDER BY seq"
+    PRUNE_CHANGES_SQL = "DELETE FROM plate_changes WHERE seq <= (SELECT MAX(seq) FROM plate_changes) - ?"
+    # Changes kept for workers that are behind, and the most one catch_up
+    # applies; a worker further behind rebuilds its indexes instead
+    CHANGE_LOG_ROWS = 100_000
+    CATCH_UP_LIMIT = 10_000
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.is_new = path == ":memory:" or not os.path.exists(path)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, cached_statements=64)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.executescript(SCHEMA)
+        # Changes only when another connection (usually another worker) commits
+        self.data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        # Position in plate_changes up to which listeners are up to date
+        self.change_seq = self.conn.execute(self.LAST_CHANGE_SQL).fetchone()[0]
+        self.catch_up_lock = threading.Lock()
+
+    def lookup(self, plate_number: str) -> Optional[LicensePlate]:
+        with self.lock:
+            row = self.conn.execute(self.LOOKUP_SQL, (plate_number.upper(),)).fetchone()
+        return row_to_plate(row) if row else None
+
+    def _delete(self, plate_key: str) -> bool:
+        with self.lock:
+            cursor = self.conn.execute(self.DELETE_SQL, (plate_key,))
+            self.conn.execute(self.PRUNE_CHANGES_SQL, (self.CHANGE_LOG_ROWS,))
+        return cursor.rowcount > 0
+
+    def _write(self, plates: List[LicensePlate]) -> int:
+        rows = [plate_to_row(plate) for plate in plates]
+        if len(rows) == 1:
+            # Single upserts (POST /plate) autocommit without an explicit transaction
+            with self.lock:
+                self.conn.execute(self.UPSERT_SQL, rows[0])
+                self.conn.execute(self.PRUNE_CHANGES_SQL, (self.CHANGE_LOG_ROWS,))
+            return 1
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(self.UPSERT_SQL, rows)
+                self.conn.execute(self.PRUNE_CHANGES_SQL, (self.CHANGE_LOG_ROWS,))
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        return len(rows)
+
+    def all_plates(self) -> List[LicensePlate]:
+        with self.lock:
+            rows = self.conn.execute(self.ALL_SQL).fetchall()
+        return [row_to_plate(row) for row in rows]
+
+    def page_plates(self, after="", limit=100, has_warrant=None, is_stolen=None, registered_from=None, registered_to=None):
+        # Keyset pagination on the primary key; secondary index entries carry
+        # plate_number too, so flag filters stay index-ordered as well
+        clauses = ["plate_number > ?"]
+        params: list = [after]
+        if has_warrant is not None:
+            clauses.append("has_warrant = ?")
+            params.append(int(has_warrant))
+        if is_stolen is not None:
+            clauses.append("is_stolen = ?")
+            params.append(int(is_stolen))
+        if registered_from is not None:
+            clauses.append("registration_date >= ?")
+            params.append(registered_from.isoformat())
+        if registered_to is not None:
+            clauses.append("registration_date <= ?")
+            params.append(registered_to.isoformat())
+        params.append(limit)
+        sql = f"SELECT {PLATE_COLUMNS} FROM plates WHERE {' AND '.join(clauses)} ORDER BY plate_number LIMIT ?"
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [row_to_plate(row) for row in rows]
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute(self.COUNT_SQL).fetchone()[0]
+
+    def ping(self) -> bool:
+        with self.lock:
+            return self.conn.execute("SELECT 1").fetchone()[0] == 1
+
+    def catch_up(self) -> bool:
+        # One catch-up at a time, so listeners hear about changes in order
+        with self.catch_up_lock:
+            with self.lock:
+                version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+                if version == self.data_version:
+                    return False
+                self.data_version = version
+                last = self.conn.execute(self.LAST_CHANGE_SQL).fetchone()[0]
+                if last - self.change_seq > self.CATCH_UP_LIMIT:
+                    self.change_seq = last
+                    return True
+                changes = self.conn.execute(self.CHANGES_SQL, (self.change_seq,)).fetchall()
+            if not changes:
+                return False
+            # Sequence numbers have no holes unless pruning got past us
+            if changes[0][0] != self.change_seq + 1:
+                self.change_seq = changes[-1][0]
+                return True
+            self.change_seq = changes[-1][0]
+            # Our own writes are in the log too; replaying the current state
+            # of every changed plate is correct either way
+            numbers = list(dict.fromkeys(number for _, number in changes))
+            found = {}
+            for start in range(0, len(numbers), 500):
+                chunk = numbers[start:start + 500]
+                sql = f"SELECT {PLATE_COLUMNS} FROM plates WHERE plate_number IN ({', '.join('?' * len(chunk))})"
+                with self.lock:
+                    rows = self.conn.execute(sql, chunk).fetchall()
+                for row in rows:
+                    found[row[0]] = row_to_plate(row)
+            removed = [number for number in numbers if number not in found]
+            for listener in self.listeners:
+                if found:
+                    listener.plates_added(list(found.values()))
+                if removed:
+                    listener.plates_removed(removed)
+        return False
+
+def open_plate_store(kind: str, path: str, **snapshot_options) -> PlateStore:
+    """Build the store selected by configuration ("sqlite", "memory", "compact" or "snapshot")"""
+    if kind == "memory":
+        return MemoryPlateStore()
+    if kind == "compact":
+        return CompactPlateStore()
+    if kind == "sqlite":
+        return SQLitePlateStore(path)
+    if kind == "snapshot":
+        from plate_snapshot import SnapshotPlateStore
+
+        return SnapshotPlateStore(path, **snapshot_options)
+    raise ValueError(f"Unknown PLATE_STORE: {kind}")
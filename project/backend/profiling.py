@@ -0,0 +1,138 @@
+"""
+Opt-in per-request profiling.
+
+`ProfilingMiddleware` runs a sampled fraction of HTTP requests, and any
+request whose debug header carries the configured token, under cProfile.
+For each one it writes `<id>.prof` (pstats data, for snakeviz or
+`python -m pstats`) and `<id>.txt` (method, path, status, duration, the
+Server-Timing stages and the top functions by cumulative time) to a
+directory that keeps only the newest `keep` profiles. The response carries
+an `X-Profile-Id` header naming the files.
+
+cProfile sees the whole event-loop thread, so work of requests running
+concurrently shows up in the profile too; only one request is profiled at
+a time. Work handed to worker threads (image normalization, detection) is
+not in the profile; its duration is in the Server-Timing stages. main.py
+installs the middleware only when profiling is enabled, so it costs nothing
+otherwise.
+"""
+
+import asyncio
+import cProfile
+import hmac
+import io
+import itertools
+import logging
+import os
+import pstats
+import random
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles sampled or header-flagged HTTP requests"""
+
+    def __init__(
+        self,
+        app,
+        directory: str = "profiles",
+        sample_rate: float = 0.0,
+        token: Optional[str] = None,
+        header: str = "x-profile",
+        keep: int = 100,
+    ):
+        self.app = app
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.token = token.encode("latin-1") if token else None
+        self.header = header.lower().encode("latin-1")
+        self.keep = keep
+        self.active = False
+        self.sequence = itertools.count(1)
+        self.captured = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def trigger(self, scope) -> Optional[str]:
+        """Why this request should be profiled ("header" or "sample"), or None"""
+        if self.token is not None:
+            for name, value in scope.get("headers") or []:
+                if name == self.header:
+                    if hmac.compare_digest(value, self.token):
+                        return "header"
+                    break
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.active:
+            return await self.app(scope, receive, send)
+        reason = self.trigger(scope)
+        if reason is None:
+            return await self.app(scope, receive, send)
+
+        self.active = True
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(self.sequence)}"
+        info: Dict[str, Any] = {
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "trigger": reason,
+            "status": None,
+            "server_timing": None,
+        }
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                info["status"] = message["status"]
+                headers = list(message.get("headers") or [])
+                for name, value in headers:
+                    if name.lower() == b"server-timing":
+                        info["server_timing"] = value.decode("latin-1")
+                headers.append((b"x-profile-id", profile_id.encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.disable()
+            self.active = False
+            info["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            # The response has gone out; write the files off the event loop
+            try:
+                await asyncio.to_thread(self.write, profile_id, profiler, info)
+            except Exception:
+                logger.exception("Failed to write profile %s", profile_id)
+
+    def write(self, profile_id: str, profiler: cProfile.Profile, info: Dict[str, Any]) -> None:
+        base = os.path.join(self.directory, profile_id)
+        profiler.dump_stats(base + ".prof")
+
+        summary = io.StringIO()
+        for key, value in info.items():
+            summary.write(f"{key}: {value}\n")
+        summary.write("\n")
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats("cumulative").print_stats(40)
+        with open(base + ".txt", "w") as f:
+            f.write(summary.getvalue())
+        self.captured += 1
+        self.rotate()
+
+    def rotate(self) -> None:
+        """Delete the oldest profiles beyond `keep`"""
+        profiles = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".prof")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in profiles[:max(0, len(profiles) - self.keep)]:
+            for path in (entry.path, entry.path[:-len(".prof")] + ".txt"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
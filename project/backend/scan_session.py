@@ -0,0 +1,56 @@
+"""
+Per-connection state for the WebSocket auto-scan stream.
+
+Frames are handed from the receive loop to the OCR worker through a
+single-slot mailbox: a frame that arrives while another is still waiting
+replaces it, so when OCR falls behind the stale frames are dropped and the
+worker always picks up the newest one. Each session also keeps a small
+cache of its own results keyed on an exact digest of the frame, so a device
+that sends the same frame again reuses the earlier answer instead of asking
+again.
+"""
+
+import asyncio
+import itertools
+from typing import Any, Dict, Optional, Tuple
+
+from ocr_cache import OCRCache
+
+class ScanSession:
+    """Latest-frame mailbox, result cache and counters of one scanning device"""
+
+    def __init__(self, cache: OCRCache):
+        self.cache = cache
+        self.frame: Optional[Tuple[int, bytes]] = None
+        self.ready = asyncio.Event()
+        self.sequence = itertools.count(1)
+        self.received = 0
+        self.dropped = 0
+        self.processed = 0
+        self.reused = 0
+
+    def put(self, data: bytes) -> int:
+        """Queue a frame, replacing any frame the worker has not started yet"""
+        frame_id = next(self.sequence)
+        self.received += 1
+        if self.frame is not None:
+            self.dropped += 1
+        self.frame = (frame_id, data)
+        self.ready.set()
+        return frame_id
+
+    async def get(self) -> Tuple[int, bytes]:
+        """Wait for and take the newest queued frame"""
+        while self.frame is None:
+            self.ready.clear()
+            await self.ready.wait()
+        frame, self.frame = self.frame, None
+        return frame
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "reused": self.reused,
+        }
@@ -0,0 +1,39 @@
+"""
+Single-flight deduplication of identical in-flight calls.
+
+While a call for a given key is running, later callers with the same key
+wait on the already-running task instead of starting their own. Results and
+exceptions are shared with every waiter.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Runs at most one call per key at a time"""
+
+    def __init__(self):
+        self.inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self.inflight.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        # A cancelled waiter must not cancel the call the others are waiting on
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.calls + self.shared
+        return {
+            "calls": self.calls,
+            "deduplicated": self.shared,
+            "dedupe_ratio": self.shared / total if total else 0.0,
+            "in_flight": len(self.inflight),
+        }
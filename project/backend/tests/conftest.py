@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# The app is a flat set of modules next to main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope="session")
+def app_main(tmp_path_factory):
+    """The app module, with a throwaway plate database"""
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    os.environ.setdefault("PLATE_DB_PATH", str(tmp_path_factory.mktemp("db") / "plates.db"))
+    import main
+    return main
@@ -0,0 +1,133 @@
+import asyncio
+import base64
+import os
+
+import pytest
+
+from admission import AdmissionController, Overloaded
+
+IMAGES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "images")
+
+async def hold(controller: AdmissionController, weight: int, release: asyncio.Event) -> None:
+    async with controller.admit(weight):
+        await release.wait()
+
+def test_sheds_with_429_when_queue_is_full():
+    async def run():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5)
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(controller, 1, release))
+        waiter = asyncio.create_task(hold(controller, 1, release))
+        await asyncio.sleep(0)
+        assert (controller.running, len(controller.waiters)) == (1, 1)
+
+        with pytest.raises(Overloaded) as shed:
+            async with controller.admit():
+                pass
+        release.set()
+        await asyncio.gather(holder, waiter)
+        return controller, shed.value
+
+    controller, shed = asyncio.run(run())
+    assert shed.status_code == 429
+    assert shed.retry_after >= 1
+    assert controller.shed_queue_full == 1
+    assert controller.running == 0
+
+def test_sheds_with_503_when_queue_wait_expires():
+    async def run():
+        controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.01)
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(controller, 1, release))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as shed:
+            async with controller.admit():
+                pass
+        release.set()
+        await holder
+        return controller, shed.value
+
+    controller, shed = asyncio.run(run())
+    assert shed.status_code == 503
+    assert controller.shed_timeout == 1
+    assert not controller.waiters
+
+def test_weighted_admission_holds_one_slot_per_call():
+    async def run():
+        controller = AdmissionController(max_concurrent=4, max_queue=4, queue_timeout=5)
+        release = asyncio.Event()
+        tiled = asyncio.create_task(hold(controller, 3, release))
+        await asyncio.sleep(0)
+        assert controller.running == 3
+        # Two more slots do not fit next to the tiled request
+        pair = asyncio.create_task(hold(controller, 2, release))
+        await asyncio.sleep(0)
+        assert (controller.running, len(controller.waiters)) == (3, 1)
+        release.set()
+        await asyncio.gather(tiled, pair)
+        # More than the limit is capped rather than never admitted
+        async with controller.admit(10):
+            assert controller.running == 4
+        return controller
+
+    controller = asyncio.run(run())
+    assert controller.running == 0
+    assert controller.admitted == 3
+
+def test_expired_heavy_waiter_lets_lighter_ones_in():
+    async def run():
+        controller = AdmissionController(max_concurrent=2, max_queue=4, queue_timeout=0.05)
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(controller, 1, release))
+        await asyncio.sleep(0)
+        heavy = asyncio.create_task(hold(controller, 2, release))
+        await asyncio.sleep(0)
+        controller.queue_timeout = 5
+        light = asyncio.create_task(hold(controller, 1, release))
+        with pytest.raises(Overloaded):
+            await heavy
+        await asyncio.sleep(0)
+        running = controller.running
+        release.set()
+        await asyncio.gather(holder, light)
+        return running
+
+    assert asyncio.run(run()) == 2
+
+def test_extract_answers_429_with_retry_after(app_main, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    controller = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=1)
+    # Every slot is taken and there is no room to queue
+    controller.running = 1
+    monkeypatch.setattr(app_main, "ocr_admission", controller)
+    with open(os.path.join(IMAGES, "plate2.jpg"), "rb") as f:
+        image = base64.b64encode(f.read()).decode("ascii")
+
+    with TestClient(app_main.app) as client:
+        response = client.post("/extract-base64", json={"base64_image": image})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert controller.shed_queue_full == 1
+
+def test_multi_plate_request_holds_a_slot_per_crop_sent(app_main, monkeypatch):
+    from timings import StageTimings
+
+    controller = AdmissionController(max_concurrent=8, max_queue=4, queue_timeout=1)
+    monkeypatch.setattr(app_main, "ocr_admission", controller)
+    crops = [(f"data:image/jpeg;base64,crop{i}", bytes([i])) for i in range(3)]
+    held = []
+
+    async def detect(image_ref, image_data, timings):
+        return crops
+
+    async def read(image_ref, image_hash=None):
+        held.append(controller.running)
+        return image_ref[-5:].upper()
+
+    monkeypatch.setattr(app_main, "detect_plate_crops", detect)
+    monkeypatch.setattr(app_main, "cached_ocr_plate", read)
+    plates = asyncio.run(app_main.recognize_all_plates(None, b"frame", StageTimings()))
+    assert plates == ["CROP0", "CROP1", "CROP2"]
+    assert held == [3, 3, 3]
+    assert controller.running == 0
@@ -0,0 +1,33 @@
+import asyncio
+
+from ocr_backends import CascadeBackend, OCRBackend
+
+class Scripted(OCRBackend):
+    """Engine stand-in answering each image ref from a (text, confidence) table"""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.batches = []
+
+    async def read_plate_scored(self, image_ref):
+        return self.answers[image_ref]
+
+    async def read_plate(self, image_ref):
+        return self.answers[image_ref][0]
+
+    async def read_plate_batch(self, image_refs):
+        self.batches.append(list(image_refs))
+        return await super().read_plate_batch(image_refs)
+
+def test_batch_counts_remote_tier_per_image():
+    local = Scripted({"a": ("ABC1234", 0.95), "b": ("UNKNOWN", 0.0), "c": ("XYZ987", 0.2), "d": ("", 0.1)})
+    remote = Scripted({"b": ("DEF456", 1.0), "c": ("XYZ987", 1.0), "d": ("UNKNOWN", 1.0)})
+    cascade = CascadeBackend(local, remote)
+
+    assert asyncio.run(cascade.read_plate_batch(["a", "b", "c", "d"])) == ["ABC1234", "DEF456", "XYZ987", "UNKNOWN"]
+    # The three escalated images go upstream in one call but count as three
+    assert remote.batches == [["b", "c", "d"]]
+    tiers = cascade.stats()["tiers"]
+    assert (tiers["local"]["calls"], tiers["local"]["accepted"]) == (4, 1)
+    assert (tiers["remote"]["calls"], tiers["remote"]["accepted"]) == (3, 3)
+    assert tiers["remote"]["hit_rate"] == 1.0
@@ -0,0 +1,107 @@
+import asyncio
+import base64
+import os
+import urllib.parse
+
+import pytest
+
+import image_ingest
+from image_ingest import InvalidImage, decode_base64_image
+
+IMAGES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "images")
+MAX_BYTES = 10 * 1024 * 1024
+
+@pytest.fixture(scope="module")
+def jpeg():
+    with open(os.path.join(IMAGES, "plate2.jpg"), "rb") as f:
+        return f.read()
+
+def encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+def rejected(payload: str, max_bytes: int = MAX_BYTES) -> int:
+    with pytest.raises(InvalidImage) as e:
+        decode_base64_image(payload, max_bytes)
+    return e.value.status_code
+
+def test_decodes_plain_payload(jpeg):
+    assert decode_base64_image(encode(jpeg), MAX_BYTES) == jpeg
+
+def test_strips_data_url_prefix_and_surrounding_whitespace(jpeg):
+    assert decode_base64_image(f"  data:image/jpeg;base64,{encode(jpeg)}\n", MAX_BYTES) == jpeg
+
+def test_rejects_data_url_without_base64():
+    assert rejected("data:image/jpeg,not-base64") == 400
+
+def test_decodes_line_wrapped_payload(jpeg):
+    wrapped = base64.encodebytes(jpeg).decode("ascii").replace("\n", "\r\n")
+    assert decode_base64_image(wrapped, MAX_BYTES) == jpeg
+
+def test_decodes_url_encoded_payload(jpeg):
+    assert decode_base64_image(urllib.parse.quote(encode(jpeg), safe=""), MAX_BYTES) == jpeg
+
+def test_decodes_escape_split_across_chunks(jpeg, monkeypatch):
+    # Small chunks so %2B / %2F escapes land on chunk boundaries
+    monkeypatch.setattr(image_ingest, "CHUNK_CHARS", 7)
+    payload = urllib.parse.quote(encode(jpeg), safe="")
+    assert decode_base64_image(payload, MAX_BYTES) == jpeg
+
+def test_rejects_oversized_payload_before_decoding(jpeg):
+    assert rejected(encode(jpeg), max_bytes=len(jpeg) - 1) == 413
+    assert decode_base64_image(encode(jpeg), max_bytes=len(jpeg)) == jpeg
+
+def test_whitespace_does_not_count_towards_the_limit(jpeg):
+    wrapped = base64.encodebytes(jpeg).decode("ascii")
+    assert decode_base64_image(wrapped, max_bytes=len(jpeg)) == jpeg
+
+def test_rejects_non_image_data():
+    assert rejected(encode(b"%PDF-1.7\n" + b"x" * 200)) == 415
+
+def test_rejects_non_image_data_in_wrapped_payload():
+    assert rejected(base64.encodebytes(b"GIF87 not really" + b"x" * 200).decode("ascii")) == 415
+
+def test_rejects_too_small_payload():
+    assert rejected(encode(b"\xff\xd8\xff\xe0" + b"\x00" * 20)) == 400
+
+@pytest.mark.parametrize("payload", [
+    "not base64 at all!!",
+    "/9j/4AAQSkZJRgABAQ" + "*" * 200,
+    # One character past a whole number of quartets
+    "/9j/4AAQSkZJRgABAQAAAQABAAD" + "A" * 202,
+])
+def test_rejects_invalid_base64(payload):
+    assert rejected(payload) == 400
+
+def test_rejects_padding_before_the_end(jpeg):
+    head, tail = encode(jpeg[:301]), encode(jpeg[301:])
+    assert "=" in head
+    assert rejected(head + "\n" + tail) == 400
+
+@pytest.mark.parametrize("first_chunk", [1, 5, 11])
+def test_raw_body_sniffs_type_across_short_chunks(app_main, monkeypatch, first_chunk):
+    with open(os.path.join(IMAGES, "plate1.webp"), "rb") as f:
+        webp = f.read()
+
+    class Body:
+        headers = {}
+
+        async def stream(self):
+            # A WebP is only recognizable from its 12th byte
+            yield webp[:first_chunk]
+            yield webp[first_chunk:]
+
+    assert asyncio.run(app_main.read_image_body(Body())) == webp
+
+def test_raw_body_rejects_non_image_after_short_chunks(app_main):
+    from fastapi import HTTPException
+
+    class Body:
+        headers = {}
+
+        async def stream(self):
+            yield b"RIFF"
+            yield b"\x00" * 200
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(app_main.read_image_body(Body()))
+    assert error.value.status_code == 415
@@ -0,0 +1,26 @@
+from ocr_backends import merge_plate_reads
+
+# Whole frame plus a 2x1 grid of tiles overlapping in the middle
+BOXES = [None, (0, 0, 600, 500), (400, 0, 1000, 500)]
+
+def test_drops_unknown_and_repeats():
+    assert merge_plate_reads([["ABC 123", "UNKNOWN"], ["abc123"], []], BOXES) == ["ABC 123"]
+    assert merge_plate_reads([["UNKNOWN"], [], ["UNKNOWN"]], BOXES) == ["UNKNOWN"]
+
+def test_keeps_nested_plates_without_tile_geometry():
+    assert merge_plate_reads([["AB12"], ["AB123"], ["B12"]]) == ["AB12", "AB123", "B12"]
+
+def test_keeps_two_nested_plates_read_in_the_whole_frame():
+    assert merge_plate_reads([["ABC12", "ABC123"], ["ABC123"], ["ABC12"]], BOXES) == ["ABC12", "ABC123"]
+
+def test_keeps_two_nested_plates_read_in_one_tile():
+    assert merge_plate_reads([["ABC123"], ["ABC12", "ABC123"], []], BOXES) == ["ABC123", "ABC12"]
+
+def test_drops_a_plate_cut_by_a_tile_edge():
+    # The left tile only saw the start of the plate the right tile read whole
+    assert merge_plate_reads([[], ["XYZ7"], ["XYZ789"]], BOXES) == ["XYZ789"]
+    assert merge_plate_reads([["XYZ789"], ["YZ789"], []], BOXES) == ["XYZ789"]
+
+def test_keeps_a_nested_plate_from_a_tile_that_does_not_overlap():
+    boxes = [None, (0, 0, 400, 500), (600, 0, 1000, 500)]
+    assert merge_plate_reads([[], ["ABC12"], ["ABC123"]], boxes) == ["ABC12", "ABC123"]
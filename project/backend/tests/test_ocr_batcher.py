@@ -0,0 +1,73 @@
+import asyncio
+
+from ocr_batcher import OCRBatcher
+
+class Upstream:
+    """send_batch stand-in that records each batch and answers per image"""
+
+    def __init__(self, error: Exception = None):
+        self.batches = []
+        self.error = error
+
+    async def __call__(self, image_refs):
+        self.batches.append(list(image_refs))
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        return [ref.upper() for ref in image_refs]
+
+def test_flushes_concurrent_requests_after_window():
+    upstream = Upstream()
+
+    async def run():
+        batcher = OCRBatcher(upstream, window_ms=10, max_batch=8)
+        return batcher, await asyncio.gather(*(batcher.submit(f"img{i}") for i in range(3)))
+
+    batcher, results = asyncio.run(run())
+    assert results == ["IMG0", "IMG1", "IMG2"]
+    assert upstream.batches == [["img0", "img1", "img2"]]
+    assert batcher.stats()["avg_batch_size"] == 3
+
+def test_flushes_full_batch_without_waiting_for_window():
+    upstream = Upstream()
+
+    async def run():
+        # A window far longer than the test: only a full batch can flush
+        batcher = OCRBatcher(upstream, window_ms=60_000, max_batch=2)
+        return await asyncio.wait_for(asyncio.gather(batcher.submit("a"), batcher.submit("b")), 1)
+
+    assert asyncio.run(run()) == ["A", "B"]
+    assert upstream.batches == [["a", "b"]]
+
+def test_overflow_goes_into_the_next_batch():
+    upstream = Upstream()
+
+    async def run():
+        batcher = OCRBatcher(upstream, window_ms=5, max_batch=2)
+        return await asyncio.gather(*(batcher.submit(f"img{i}") for i in range(5)))
+
+    assert asyncio.run(run()) == ["IMG0", "IMG1", "IMG2", "IMG3", "IMG4"]
+    assert upstream.batches == [["img0", "img1"], ["img2", "img3"], ["img4"]]
+
+def test_upstream_error_reaches_every_waiter():
+    upstream = Upstream(RuntimeError("upstream down"))
+
+    async def run():
+        batcher = OCRBatcher(upstream, window_ms=5, max_batch=8)
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [str(result) for result in results] == ["upstream down", "upstream down"]
+    assert len(upstream.batches) == 1
+
+def test_requests_apart_in_time_are_sent_separately():
+    upstream = Upstream()
+
+    async def run():
+        batcher = OCRBatcher(upstream, window_ms=1, max_batch=8)
+        first = await batcher.submit("a")
+        second = await batcher.submit("b")
+        return first, second
+
+    assert asyncio.run(run()) == ("A", "B")
+    assert upstream.batches == [["a"], ["b"]]
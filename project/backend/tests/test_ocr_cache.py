@@ -0,0 +1,46 @@
+import io
+
+from PIL import Image, ImageDraw, ImageFont
+
+from image_pipeline import normalize_image
+from ocr_cache import OCRCache
+
+def plate_image(text: str, fmt: str = "PNG") -> bytes:
+    """A synthetic plate: dark text on a white plate with a border"""
+    img = Image.new("RGB", (520, 120), "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([4, 4, 515, 115], outline="black", width=6)
+    draw.text((30, 12), text, fill="black", font=ImageFont.load_default(size=90))
+    out = io.BytesIO()
+    img.save(out, fmt)
+    return out.getvalue()
+
+def test_plates_one_character_apart_do_not_share_an_entry():
+    cache = OCRCache(max_entries=16, ttl_seconds=60)
+    first = normalize_image(plate_image("ABC1234"))
+    cache.put(first.image_hash, "ABC1234")
+
+    for text in ("ABC1284", "8BC1234"):
+        assert cache.get(normalize_image(plate_image(text)).image_hash) is None
+    assert cache.get(first.image_hash) == "ABC1234"
+
+def test_same_picture_hits_whatever_its_container():
+    cache = OCRCache(max_entries=16, ttl_seconds=60)
+    cache.put(normalize_image(plate_image("ABC1234", "PNG")).image_hash, "ABC1234")
+
+    assert cache.get(normalize_image(plate_image("ABC1234", "BMP")).image_hash) == "ABC1234"
+    assert (cache.hits, cache.misses) == (1, 0)
+
+def test_entries_expire_and_evict_least_recently_used(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("ocr_cache.time.monotonic", lambda: now[0])
+    cache = OCRCache(max_entries=2, ttl_seconds=10)
+    cache.put(b"a", 1)
+    cache.put(b"b", 2)
+    assert cache.get(b"a") == 1
+    cache.put(b"c", 3)
+    assert cache.get(b"b") is None
+
+    now[0] += 11
+    assert cache.get(b"a") is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from models import LicensePlate
+from plate_io import MAX_LINE_BYTES, LineTooLong, export_csv, export_ndjson, import_plates
+from plate_store import MemoryPlateStore
+
+PLATES = [
+    LicensePlate(
+        plate_number="NL1", owner_name='Jo "JJ"\nSmith, Jr', dob=date(1990, 1, 1), has_warrant=True,
+        warrant_reason="line one\r\nline two", registration_date=date(2020, 1, 1), is_stolen=False,
+    ),
+    LicensePlate(
+        plate_number="OK2", owner_name="Plain", dob=date(1985, 6, 15), has_warrant=False,
+        warrant_reason=None, registration_date=date(2021, 3, 4), is_stolen=True,
+    ),
+]
+
+def import_body(store, body: bytes, fmt: str, chunk_size: int = 7):
+    async def chunks():
+        for offset in range(0, len(body), chunk_size):
+            yield body[offset:offset + chunk_size]
+    return asyncio.run(import_plates(store, chunks(), fmt))
+
+def source_store() -> MemoryPlateStore:
+    store = MemoryPlateStore()
+    store.add_many(PLATES)
+    return store
+
+def test_csv_round_trip_keeps_multiline_fields():
+    body = b"".join(export_csv(source_store()))
+    target = MemoryPlateStore()
+    assert import_body(target, body, "csv") == {"accepted": 2, "rejected": 0, "errors": []}
+    assert [target.lookup(plate.plate_number) for plate in PLATES] == PLATES
+
+def test_ndjson_round_trip():
+    body = b"".join(export_ndjson(source_store()))
+    target = MemoryPlateStore()
+    assert import_body(target, body, "ndjson")["accepted"] == 2
+    assert [target.lookup(plate.plate_number) for plate in PLATES] == PLATES
+
+def test_csv_reports_rows_by_starting_line():
+    body = (
+        b"plate_number,owner_name,dob,has_warrant,warrant_reason,registration_date,is_stolen\n"
+        b'AB1,"Two\nlines",1990-01-01,false,,2020-01-01,false\n'
+        b"BAD,Owner,not-a-date,false,,2020-01-01,false\n"
+        b'OPEN,"never closed,1990-01-01,false,,2020-01-01,false\n'
+    )
+    result = import_body(MemoryPlateStore(), body, "csv")
+    assert result["accepted"] == 1
+    assert [error["line"] for error in result["errors"]] == [4, 5]
+    assert result["errors"][1]["error"] == "unterminated quoted CSV field"
+
+def test_overlong_line_stops_the_import():
+    good = b"".join(export_ndjson(source_store()))
+    target = MemoryPlateStore()
+    with pytest.raises(LineTooLong) as too_long:
+        import_body(target, good + b'{"plate_number": "' + b"A" * MAX_LINE_BYTES + b'"}\n', "ndjson", chunk_size=4096)
+    assert too_long.value.line_number == 3
+    # The rows before it are still written
+    assert too_long.value.accepted == 2
+    assert target.lookup("OK2") is not None
+
+def test_bulk_import_answers_413_for_an_overlong_line(app_main):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app_main.app) as client:
+        response = client.post(
+            "/plates/bulk", content=b"x" * (MAX_LINE_BYTES + 1), headers={"Content-Type": "application/x-ndjson"},
+        )
+    assert response.status_code == 413
+    assert response.json()["detail"].startswith("line 1 is longer than")
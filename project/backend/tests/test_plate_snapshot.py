@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from models import LicensePlate
+from plate_snapshot import SnapshotPlateStore
+
+def make_plate(plate_number: str, **fields) -> LicensePlate:
+    values = {
+        "plate_number": plate_number,
+        "owner_name": "Test Owner",
+        "dob": date(1990, 1, 1),
+        "has_warrant": False,
+        "warrant_reason": None,
+        "registration_date": date(2020, 1, 1),
+        "is_stolen": False,
+    }
+    values.update(fields)
+    return LicensePlate(**values)
+
+def journals(path: str):
+    directory, name = os.path.split(path)
+    return sorted(entry for entry in os.listdir(directory) if entry.startswith(name + ".") and entry.endswith(".journal"))
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / "plates.snap")
+
+def test_journal_replays_in_another_worker(snapshot_path):
+    writer = SnapshotPlateStore(snapshot_path, sync_interval=0)
+    reader = SnapshotPlateStore(snapshot_path, sync_interval=0)
+    writer.add(make_plate("ABC123"))
+    writer.add(make_plate("XYZ789", has_warrant=True, warrant_reason="Unpaid fines"))
+    writer.remove("ABC123")
+
+    reader.refresh()
+    assert reader.lookup("ABC123") is None
+    assert reader.lookup("xyz789").warrant_reason == "Unpaid fines"
+    assert reader.count() == 1
+
+def test_journal_replays_on_open(snapshot_path):
+    writer = SnapshotPlateStore(snapshot_path, sync_interval=0)
+    writer.add_many([make_plate(f"P{i:04d}") for i in range(50)])
+    writer.remove("P0007")
+
+    reopened = SnapshotPlateStore(snapshot_path, sync_interval=0)
+    assert reopened.count() == 49
+    assert reopened.lookup("P0007") is None
+    assert reopened.lookup("P0049") is not None
+
+def test_replay_notifies_listeners(snapshot_path):
+    writer = SnapshotPlateStore(snapshot_path, sync_interval=0)
+    reader = SnapshotPlateStore(snapshot_path, sync_interval=0)
+    events = []
+
+    class Recorder:
+        def plates_added(self, plates):
+            events.append(("added", [plate.plate_number for plate in plates]))
+
+        def plates_removed(self, plate_numbers):
+            events.append(("removed", list(plate_numbers)))
+
+    reader.add_listener(Recorder())
+    writer.add(make_plate("NEW1"))
+    writer.remove("NEW1")
+
+    reader.refresh()
+    assert events == [("added", ["NEW1"]), ("removed", ["NEW1"])]
+
+def test_compact_folds_journal_into_snapshot(snapshot_path):
+    store = SnapshotPlateStore(snapshot_path, sync_interval=0)
+    other = SnapshotPlateStore(snapshot_path, sync_interval=0)
+    store.add_many([make_plate(f"P{i:04d}") for i in range(20)])
+    store.remove("P0003")
+    generation = store.state[0].generation
+
+    store.compact()
+    snapshot, puts, deletes = store.state
+    assert snapshot.generation != generation
+    assert (puts, deletes) == ({}, set())
+    assert len(snapshot) == 19
+    assert store.stats()["journal_bytes"] == 0
+
+    # The other worker swaps to the new snapshot with the same contents
+    other.refresh()
+    assert other.state[0].generation == snapshot.generation
+    assert other.count() == 19
+    assert other.lookup("P0003") is None
+
+def test_writes_after_compaction_go_to_the_new_journal(snapshot_path):
+    store = SnapshotPlateStore(snapshot_path, sync_interval=0)
+    other = SnapshotPlateStore(snapshot_path, sync_interval=0)
+    store.add(make_plate("OLD1"))
+    store.compact()
+    # This worker has not seen the compaction yet when it writes
+    other.add(make_plate("NEW1"))
+
+    store.refresh()
+    assert store.lookup("OLD1") is not None
+    assert store.lookup("NEW1") is not None
+    assert os.path.basename(store.journal_path(store.state[0].generation)) in journals(snapshot_path)
+    assert store.stats()["journal_bytes"] > 0
+
+def test_compaction_removes_drained_journals(snapshot_path):
+    store = SnapshotPlateStore(snapshot_path, sync_interval=0)
+    store.add(make_plate("ONE1"))
+    first = store.journal_path(store.state[0].generation)
+    store.compact()
+    store.add(make_plate("TWO2"))
+    store.compact()
+
+    # Only the journal retired by the latest compaction is kept
+    assert os.path.basename(first) not in journals(snapshot_path)
+    assert len(journals(snapshot_path)) <= 2
+    assert store.count() == 2
+
+def test_compaction_runs_in_the_background(snapshot_path):
+    store = SnapshotPlateStore(snapshot_path, sync_interval=0.01, compact_bytes=1024)
+    store.add_many([make_plate(f"P{i:04d}") for i in range(20)])
+
+    for _ in range(200):
+        if store.compactions:
+            break
+        time.sleep(0.01)
+    assert store.compactions == 1
+    assert store.count() == 20
+
+def test_rejects_plate_longer_than_key(snapshot_path):
+    store = SnapshotPlateStore(snapshot_path, sync_interval=0)
+    with pytest.raises(ValueError):
+        store.add(make_plate("X" * 17))
+
+def test_lookups_do_not_wait_for_a_compaction(snapshot_path, monkeypatch):
+    import plate_snapshot
+
+    store = SnapshotPlateStore(snapshot_path, sync_interval=0)
+    store.add_many([make_plate(f"P{i:04d}") for i in range(20)])
+    writing = threading.Event()
+    real_write = plate_snapshot.write_snapshot
+
+    def slow_write(*args, **kwargs):
+        writing.set()
+        time.sleep(0.5)
+        return real_write(*args, **kwargs)
+
+    monkeypatch.setattr(plate_snapshot, "write_snapshot", slow_write)
+    compaction = threading.Thread(target=store.compact)
+    compaction.start()
+    assert writing.wait(5)
+
+    start = time.perf_counter()
+    assert store.lookup("P0005") is not None
+    assert store.catch_up() is False
+    # The sync thread's journal tailing does not wait either
+    store.refresh()
+    assert time.perf_counter() - start < 0.1
+    compaction.join()
+    assert store.compactions == 1
+    assert store.count() == 20
@@ -0,0 +1,103 @@
+from datetime import date
+
+import pytest
+
+from hotlist_index import HotlistIndex
+from models import LicensePlate
+from plate_store import SQLitePlateStore
+
+def make_plate(plate_number: str, **fields) -> LicensePlate:
+    values = {
+        "plate_number": plate_number,
+        "owner_name": "Test Owner",
+        "dob": date(1990, 1, 1),
+        "has_warrant": False,
+        "warrant_reason": None,
+        "registration_date": date(2020, 1, 1),
+        "is_stolen": False,
+    }
+    values.update(fields)
+    return LicensePlate(**values)
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def plates_added(self, plates):
+        self.events.append(("added", sorted(plate.plate_number for plate in plates)))
+
+    def plates_removed(self, plate_numbers):
+        self.events.append(("removed", sorted(plate_numbers)))
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "plates.db")
+
+def test_catch_up_replays_other_workers_changes(db_path):
+    worker = SQLitePlateStore(db_path)
+    other = SQLitePlateStore(db_path)
+    recorder = Recorder()
+    worker.add_listener(recorder)
+
+    other.add_many([make_plate("AAA111"), make_plate("BBB222")])
+    other.add(make_plate("AAA111", is_stolen=True))
+    other.remove("BBB222")
+
+    assert worker.catch_up() is False
+    assert recorder.events == [("added", ["AAA111"]), ("removed", ["BBB222"])]
+    # Nothing new since
+    assert worker.catch_up() is False
+    assert len(recorder.events) == 2
+
+def test_own_writes_need_no_catch_up(db_path):
+    worker = SQLitePlateStore(db_path)
+    recorder = Recorder()
+    worker.add_listener(recorder)
+    worker.add(make_plate("OWN1"))
+    recorder.events.clear()
+
+    assert worker.catch_up() is False
+    assert recorder.events == []
+
+def test_catch_up_keeps_the_hotlist_ready(db_path):
+    worker = SQLitePlateStore(db_path)
+    other = SQLitePlateStore(db_path)
+    index = HotlistIndex(1000)
+    worker.add_listener(index)
+    index.mark_ready()
+    assert not index.might_contain("HOT777")
+
+    other.add(make_plate("HOT777", has_warrant=True, warrant_reason="Test"))
+    worker.catch_up()
+    assert index.ready
+    assert index.might_contain("HOT777")
+    assert index.alerts("HOT777") == ["WARRANT: Test"]
+
+    other.remove("HOT777")
+    worker.catch_up()
+    # No longer flagged, so the caller falls through to the store
+    assert index.alerts("HOT777") is None
+
+def test_too_far_behind_asks_for_a_rebuild(db_path, monkeypatch):
+    monkeypatch.setattr(SQLitePlateStore, "CATCH_UP_LIMIT", 3)
+    worker = SQLitePlateStore(db_path)
+    other = SQLitePlateStore(db_path)
+    recorder = Recorder()
+    worker.add_listener(recorder)
+
+    other.add_many([make_plate(f"P{i}") for i in range(5)])
+    assert worker.catch_up() is True
+    assert recorder.events == []
+    # Later changes are replayed again
+    other.add(make_plate("NEXT1"))
+    assert worker.catch_up() is False
+    assert recorder.events == [("added", ["NEXT1"])]
+
+def test_pruned_changes_ask_for_a_rebuild(db_path, monkeypatch):
+    monkeypatch.setattr(SQLitePlateStore, "CHANGE_LOG_ROWS", 2)
+    worker = SQLitePlateStore(db_path)
+    other = SQLitePlateStore(db_path)
+    for i in range(5):
+        other.add(make_plate(f"P{i}"))
+    assert other.conn.execute("SELECT COUNT(*) FROM plate_changes").fetchone()[0] <= 3
+    assert worker.catch_up() is True
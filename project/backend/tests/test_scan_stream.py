@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from ocr_cache import OCRCache
+from scan_session import ScanSession
+
+class Socket:
+    """WebSocket stand-in whose pushes fail with send_error"""
+
+    def __init__(self, send_error: Exception = None):
+        self.sent = []
+        self.closed = None
+        self.send_error = send_error
+
+    async def send_text(self, text):
+        if self.send_error is not None:
+            raise self.send_error
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.closed = code
+
+@pytest.fixture
+def reads(app_main, monkeypatch):
+    """Frames recognized upstream (the scan path reads every plate in a frame)"""
+    frames = []
+
+    async def recognize(image_ref, image_data, timings):
+        frames.append(image_data)
+        return ["UNKNOWN"]
+
+    monkeypatch.setattr(app_main, "recognize_all_plates", recognize)
+    return frames
+
+def test_only_an_identical_frame_reuses_the_result(app_main, reads):
+    session = ScanSession(OCRCache(8, 30))
+
+    async def run():
+        for frame_id, data in enumerate((b"frame-a", b"frame-a", b"frame-b"), 1):
+            await app_main.scan_frame_message(session, frame_id, data)
+
+    asyncio.run(run())
+    assert reads == [b"frame-a", b"frame-b"]
+    assert session.reused == 1
+
+def test_failed_push_closes_the_socket(app_main, reads):
+    session = ScanSession(OCRCache(8, 30))
+    socket = Socket(RuntimeError("connection lost"))
+    session.put(b"frame")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(asyncio.wait_for(app_main.scan_worker(socket, session), 1))
+    assert socket.closed == 1011
+    assert session.processed == 1
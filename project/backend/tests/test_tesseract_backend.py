@@ -0,0 +1,59 @@
+import sys
+import types
+
+import pytest
+from PIL import Image
+
+import ocr_backends
+from ocr_backends import TesseractBackend
+
+@pytest.fixture
+def engine(monkeypatch):
+    """pytesseract stand-in answering every line with engine.text at engine.conf"""
+    module = types.SimpleNamespace(
+        pytesseract=types.SimpleNamespace(tesseract_cmd="tesseract"),
+        Output=types.SimpleNamespace(DICT="dict"),
+        text="ABC1234",
+        conf=95,
+        lines=[],
+    )
+
+    def image_to_data(image, config, output_type):
+        module.lines.append(image.size)
+        return {"text": [module.text], "conf": [module.conf]}
+
+    module.image_to_data = image_to_data
+    monkeypatch.setitem(sys.modules, "pytesseract", module)
+    return module
+
+@pytest.fixture
+def detector(monkeypatch):
+    """Records detector calls and answers with one box in the left half"""
+    calls = []
+
+    def find_plate_regions(img, max_regions):
+        calls.append(img.size)
+        return [(0, 0, img.width // 2, img.height)]
+
+    monkeypatch.setattr(ocr_backends, "find_plate_regions", find_plate_regions)
+    return calls
+
+def test_crop_is_read_without_the_detector(engine, detector):
+    backend = TesseractBackend()
+    assert backend.read_regions(Image.new("RGB", (400, 100))) == [("ABC1234", 0.95)]
+    assert detector == []
+    assert len(engine.lines) == 1
+
+def test_failed_crop_read_falls_back_to_the_detector(engine, detector):
+    engine.text = "?"
+    backend = TesseractBackend()
+    assert backend.read_regions(Image.new("RGB", (400, 100))) == []
+    assert detector == [(400, 100)]
+    # The whole crop and then the detected region
+    assert len(engine.lines) == 2
+
+def test_frame_goes_through_the_detector(engine, detector):
+    backend = TesseractBackend()
+    assert backend.read_regions(Image.new("RGB", (1600, 1200))) == [("ABC1234", 0.95)]
+    assert detector == [(1600, 1200)]
+    assert len(engine.lines) == 1
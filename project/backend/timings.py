@@ -0,0 +1,94 @@
+"""
+Per-request stage timings, exposed to clients through the Server-Timing header,
+cumulative latency histograms for stats endpoints, and sliding windows of
+recent latencies for percentile-based decisions such as request hedging.
+"""
+
+import bisect
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# Finer buckets for request stages that can take well under a millisecond
+STAGE_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5) + LATENCY_BUCKETS_MS
+# In-memory store operations, from a microsecond up
+FAST_BUCKETS_MS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 100, 1000)
+
+class StageTimings:
+    """Collects how long each named stage of a request took"""
+
+    def __init__(self):
+        self.stages: List[Tuple[str, float]] = []
+        self.notes: Dict[str, str] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, (time.perf_counter() - start) * 1000))
+
+    def note(self, name: str, description: str) -> None:
+        """Attach a description (e.g. byte counts) to a stage"""
+        self.notes[name] = description
+
+    def server_timing(self) -> str:
+        parts = []
+        for name, ms in self.stages:
+            part = f"{name};dur={ms:.2f}"
+            if name in self.notes:
+                part += f';desc="{self.notes[name]}"'
+            parts.append(part)
+        return ", ".join(parts)
+
+    def headers(self) -> Dict[str, str]:
+        return {"Server-Timing": self.server_timing()} if self.stages else {}
+
+class LatencyHistogram:
+    """Cumulative latency distribution over fixed millisecond buckets"""
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+
+    def stats(self) -> Dict[str, Any]:
+        # Cumulative like Prometheus: le_X counts every observation <= X ms
+        buckets = {}
+        running = 0
+        for bound, count in zip(self.buckets_ms, self.counts):
+            running += count
+            buckets[f"le_{bound:g}"] = running
+        buckets["le_inf"] = self.count
+        return {
+            "count": self.count,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "buckets": buckets,
+        }
+
+class LatencyWindow:
+    """The most recent `size` latency samples, for percentiles of current behaviour"""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def observe(self, ms: float) -> None:
+        self.samples.append(ms)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """pct-th percentile in ms; None until min_samples have been seen"""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]